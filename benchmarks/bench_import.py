@@ -0,0 +1,25 @@
+"""Import time of sensor_response_curves, excluding numpy
+
+    python benchmarks/bench_import.py [repeat]
+"""
+import subprocess
+import sys
+
+CODE = (
+    'import time\n'
+    'import numpy\n'
+    'start = time.perf_counter()\n'
+    'import sensor_response_curves\n'
+    'print(time.perf_counter() - start)\n')
+
+
+def main(repeat=10):
+    times = [
+        float(subprocess.check_output([sys.executable, '-c', CODE]))
+        for _ in range(repeat)]
+    print('import sensor_response_curves: min {:.2f} ms, max {:.2f} ms over {} runs'.format(
+        min(times) * 1e3, max(times) * 1e3, repeat))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,35 @@
+"""Scaling of convolve_parallel from 1 to N worker processes
+
+    python benchmarks/bench_parallel.py [npixels] [max_workers]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+import sensor_response_curves.convolution as srconv
+import sensor_response_curves.parallel as srparallel
+
+
+def main(npixels=400000, max_workers=None):
+    max_workers = max_workers or os.cpu_count() or 1
+    wavelength = np.arange(400, 2500, 5.)
+    spectra = np.random.RandomState(0).rand(npixels, wavelength.size)
+    srconv.get_kernel('S2A', wavelength)
+
+    start = time.perf_counter()
+    srconv.convolve('S2A', wavelength, spectra)
+    serial = time.perf_counter() - start
+    print('{} pixels x {} wavelengths, serial convolve: {:.3f} s'.format(
+        npixels, wavelength.size, serial))
+    print('{:>8}{:>12}{:>10}'.format('workers', 'time [s]', 'speedup'))
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        srparallel.convolve_parallel('S2A', wavelength, spectra, workers=workers)
+        elapsed = time.perf_counter() - start
+        print('{:>8}{:>12.3f}{:>10.2f}'.format(workers, elapsed, serial / elapsed))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
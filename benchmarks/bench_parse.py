@@ -0,0 +1,28 @@
+"""Parse time per sensor: np.genfromtxt versus _parse_csv
+
+    python benchmarks/bench_parse.py [repeat]
+"""
+import sys
+import timeit
+
+import numpy as np
+
+import sensor_response_curves as srcurves
+
+
+def _parse_genfromtxt(infile):
+    return np.genfromtxt(infile, delimiter=',', names=True, dtype='float', comments='#')
+
+
+def main(repeat=20):
+    print('{:<8}{:>16}{:>16}{:>10}'.format('sensor', 'genfromtxt [ms]', '_parse_csv [ms]', 'speedup'))
+    for sensor in srcurves.SUPPORTED_SENSORS:
+        infile = srcurves._get_csv_file(sensor)
+        before = min(timeit.repeat(lambda: _parse_genfromtxt(infile), number=1, repeat=repeat))
+        after = min(timeit.repeat(lambda: srcurves._parse_csv(infile), number=1, repeat=repeat))
+        print('{:<8}{:>16.2f}{:>16.2f}{:>10.1f}'.format(
+            sensor, before * 1e3, after * 1e3, before / after))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -1,10 +1,31 @@
 from __future__ import division
+import collections
+import importlib
+import io
 import os
 
 import numpy as np
 
-from . import _version
-__version__ = _version.get_versions()['version']
+from ._cache import LRUCache
+
+# submodules imported on first attribute access
+_LAZY_SUBMODULES = (
+    'bulk', 'bundle', 'characteristics', 'convolution', 'cube', 'lut',
+    'metadata', 'parallel', 'resample', 'sbaf', 'shared', 'solar',
+    'support', 'transform')
+
+
+def __getattr__(name):
+    if name == '__version__':
+        # resolving the version may call git, so only do it on demand
+        from . import _version
+        version = _version.get_versions()['version']
+        globals()['__version__'] = version
+        return version
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError(
+        'module \'{}\' has no attribute \'{}\''.format(__name__, name))
 
 
 CSVDIR = os.path.join(
@@ -152,18 +173,177 @@ def _check_supported_sensor(sensor):
             ''.format(sensor, SUPPORTED_SENSORS))
 
 
+# parsed curves per sensor, keyed on (sensor, kind) and stamped with file mtime
+_CURVE_CACHE = LRUCache()
+
+# columnar response curves of one sensor
+# curves has shape (nbands, nvals) with the default bands first
+_CurveTable = collections.namedtuple(
+    '_CurveTable', ['wavelength', 'curves', 'bandkeys', 'band_index'])
+
+
+# shared-memory store set by shared.publish and shared.attach
+_SHARED_STORE = None
+
+
+def _stamp(sensors):
+    """Get modification times of the CSV files of sensors"""
+    return tuple(os.path.getmtime(_get_csv_file(sensor)) for sensor in sensors)
+
+
+def _cached(sensor, kind, build):
+    """Get build(sensor) from cache, valid until the sensor's CSV file changes"""
+    return _CURVE_CACHE.get_or_build(
+        (sensor, kind), lambda: build(sensor), stamp=_stamp([sensor]))
+
+
+def load_all(sensors=None, workers=None):
+    """Load response curves of many sensors into the cache concurrently
+
+    Sensors are loaded in a thread pool. Callers asking for a sensor
+    that is being loaded wait for that load instead of repeating it.
+
+    Parameters
+    ----------
+    sensors : list of str, optional
+        sensors to load
+        default: SUPPORTED_SENSORS
+    workers : int, optional
+        number of threads
+        default: one per sensor
+    """
+    import concurrent.futures
+    sensors = sensors or SUPPORTED_SENSORS
+    for sensor in sensors:
+        _check_supported_sensor(sensor)
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers or len(sensors)) as executor:
+        for _ in executor.map(_get_curve_table, sensors):
+            pass
+
+
+def clear_cache():
+    """Remove all parsed response curves from the cache"""
+    _CURVE_CACHE.clear()
+
+
+def cache_info():
+    """Get statistics of the parsed response curve cache
+
+    Returns
+    -------
+    CacheInfo : namedtuple
+        hits, misses, maxsize and currsize (number of entries),
+        maxbytes and nbytes (memory held by cached arrays)
+    """
+    return _CURVE_CACHE.info()
+
+
+def set_cache_maxsize(maxsize):
+    """Limit the number of cached entries
+
+    Each sensor takes one entry per kind of data loaded for it:
+
+        raw data (get_data_raw)
+        data with standard names (get_data_standard_names)
+        columnar curves (get_response_curves)
+        band supports, one per threshold (support.get_band_support)
+        band characteristics (characteristics.get_band_characteristics)
+
+    Least recently used entries are evicted first.
+
+    Parameters
+    ----------
+    maxsize : int or None
+        maximum number of entries
+        None means unbounded
+    """
+    _CURVE_CACHE.set_maxsize(maxsize)
+
+
+# characters dropped from column names, as by np.genfromtxt
+_DELETECHARS = set(r"""~!@#$%^&*()-=+~\|]}[{';: /?.>,<""")
+
+
+def _validate_name(name, i):
+    name = name.strip().replace(' ', '_')
+    name = ''.join(c for c in name if c not in _DELETECHARS)
+    return name or 'f{}'.format(i)
+
+
+def _parse_csv_array(infile):
+    """Parse numeric CSV file with header line into 2D array
+
+    Comments start with '#'. Empty fields are read as NaN.
+
+    Returns
+    -------
+    names : list of str
+        column names, validated like np.genfromtxt does
+    values : ndarray shape(nrows, ncols)
+        C-contiguous float array
+    """
+    with io.open(infile, encoding='utf-8') as f:
+        text = f.read()
+    if '#' in text:
+        text = '\n'.join(line.split('#', 1)[0].rstrip() for line in text.splitlines())
+    header, _, body = text.lstrip().partition('\n')
+    names = [_validate_name(name, i) for i, name in enumerate(header.split(','))]
+    body = '\n' + body.strip() + '\n'
+    if ',,' in body or ',\n' in body or '\n,' in body:
+        body = (
+            body.replace(',,', ',nan,').replace(',,', ',nan,')
+            .replace(',\n', ',nan\n').replace('\n,', '\nnan,'))
+    values = np.loadtxt(io.StringIO(body), delimiter=',', dtype='float', ndmin=2)
+    if values.shape[1] != len(names):
+        raise ValueError(
+            'Expected {} columns in \'{}\', got {}.'
+            ''.format(len(names), infile, values.shape[1]))
+    return names, np.ascontiguousarray(values)
+
+
 def _parse_csv(infile):
-    return np.genfromtxt(infile, delimiter=',', names=True, dtype='float', comments='#')
+    """Parse CSV file to structured array with one field per column
+
+    The structured array is a view on the 2D array from _parse_csv_array.
+    """
+    names, values = _parse_csv_array(infile)
+    dtype = np.dtype([(name, values.dtype) for name in names])
+    return values.view(dtype)[:, 0]
+
+
+def _load_csv_data(sensor, infile):
+    """Load parsed CSV data from the binary bundle, falling back to parsing"""
+    from . import bundle
+    bundle_dir = bundle.get_bundle_dir()
+    if bundle_dir is not None:
+        try:
+            return bundle.load_array(sensor, infile, _parse_csv, bundle_dir=bundle_dir)
+        except (IOError, OSError):
+            pass
+    return _parse_csv(infile)
+
 
+def _make_readonly(a):
+    a.flags.writeable = False
+    return a
 
-def _rename_fields_inplace(a, name_map):
-    a.dtype.names = [name_map[name] for name in a.dtype.names if name in a.dtype.names]
+
+def _rename_fields(a, name_map):
+    """Get view of structured array a with renamed fields"""
+    names = [name_map.get(name, name) for name in a.dtype.names]
+    dtype = np.dtype({
+        'names': names,
+        'formats': [a.dtype.fields[name][0] for name in a.dtype.names],
+        'offsets': [a.dtype.fields[name][1] for name in a.dtype.names],
+        'itemsize': a.dtype.itemsize})
+    return a.view(dtype)
 
 
 def _rename_sensor_fields(data, sensor):
     sensorgroup = SENSOR_GROUPS[sensor]
     colmap = COLS_TO_BANDS[sensorgroup]
-    _rename_fields_inplace(data, colmap)
+    return _rename_fields(data, colmap)
 
 
 def _get_default_bands(sensor):
@@ -172,6 +352,12 @@ def _get_default_bands(sensor):
     return bandkeys
 
 
+def _get_defined_default_bands(sensor):
+    """Get default bands of sensor that its file defines, in default order"""
+    bandkeys = _get_curve_table(sensor).bandkeys
+    return [bandkeys[i] for i in _get_band_index(sensor)]
+
+
 def _get_csv_file(sensor):
     """Get CSV file for given sensor
 
@@ -192,6 +378,10 @@ def _get_csv_file(sensor):
 def get_data_raw(sensor):
     """Get sensor response curve data for sensor
 
+    Parsed data is cached per sensor until the CSV file changes.
+    It is memory-mapped from the binary bundle (see `bundle`)
+    unless the bundle is disabled or not writable.
+
     Parameters
     ----------
     sensor : str in SUPPORTED_SENSORS
@@ -199,11 +389,24 @@ def get_data_raw(sensor):
 
     Returns
     -------
-    pandas.DataFrame
+    ndarray : read-only structured array
     """
-    _check_supported_sensor(sensor)
-    infile = _get_csv_file(sensor)
-    return _parse_csv(infile)
+    return _cached(sensor, 'raw', _build_data_raw)
+
+
+def _get_shared_store(sensor):
+    """Get attached shared-memory store if it holds current data for sensor"""
+    store = _SHARED_STORE
+    if store is not None and store.is_current(sensor, os.path.getmtime(_get_csv_file(sensor))):
+        return store
+    return None
+
+
+def _build_data_raw(sensor):
+    store = _get_shared_store(sensor)
+    if store is not None:
+        return store.get_data_raw(sensor)
+    return _make_readonly(_load_csv_data(sensor, _get_csv_file(sensor)))
 
 
 def get_data_standard_names(sensor):
@@ -216,21 +419,72 @@ def get_data_standard_names(sensor):
 
     Returns
     -------
-    pandas.DataFrame : data with standard names
+    ndarray : read-only structured array with standard names
         column order corresponds to band order
     """
-    data = get_data_raw(sensor)
-    _rename_sensor_fields(data, sensor)
+    return _cached(sensor, 'standard', _build_data_standard_names)
+
+
+def _build_data_standard_names(sensor):
+    data = _rename_sensor_fields(get_data_raw(sensor), sensor)
     if 'wavelength' not in data.dtype.names:
         raise RuntimeError(
                 'Renaming seems to have failed.')
     return data
 
 
+def _get_curve_table(sensor):
+    """Get columnar response curves for sensor"""
+    return _cached(sensor, 'columnar', _build_curve_table)
+
+
+def _build_curve_table(sensor):
+    store = _get_shared_store(sensor)
+    if store is not None:
+        return store.get_curve_table(sensor)
+    data = get_data_standard_names(sensor)
+    names = [name for name in data.dtype.names if name != 'wavelength']
+    default_bands = [name for name in _get_default_bands(sensor) if name in names]
+    bandkeys = default_bands + [name for name in names if name not in default_bands]
+    curves = np.empty((len(bandkeys), data.shape[0]), dtype='float')
+    for i, name in enumerate(bandkeys):
+        curves[i] = data[name]
+    wavelength = np.ascontiguousarray(data['wavelength'])
+    return _CurveTable(
+        wavelength=_make_readonly(wavelength),
+        curves=_make_readonly(curves),
+        bandkeys=tuple(bandkeys),
+        band_index={name: i for i, name in enumerate(bandkeys)})
+
+
+def _get_bandkeys(sensor, pan_only=False, bandkeys=None, band_ids=None):
+    """Resolve band selection arguments to list of band keys"""
+    if bandkeys is not None:
+        return bandkeys
+    elif band_ids is not None:
+        all_bands = _get_default_bands(sensor)
+        return [all_bands[i] for i in band_ids]
+    elif pan_only:
+        return ['pan']
+    else:
+        return _get_default_bands(sensor)
+
+
+def _get_band_index(sensor, pan_only=False, bandkeys=None, band_ids=None):
+    """Get rows of selected bands in columnar curves, skipping undefined bands"""
+    band_index = _get_curve_table(sensor).band_index
+    bandkeys = _get_bandkeys(sensor, pan_only, bandkeys, band_ids)
+    return [band_index[name] for name in bandkeys if name in band_index]
+
+
 def get_response_curves(
-        sensor, pan_only=False, bandkeys=None, band_ids=None):
+        sensor, pan_only=False, bandkeys=None, band_ids=None, out=None):
     """Read response curves for given sensor
 
+    Curves are returned as a read-only view on the cached data
+    if the selected bands are stored consecutively (as is the
+    default band sequence), otherwise as a copy.
+
     Parameters
     ----------
     sensor : str in SUPPORTED_SENSORS
@@ -244,25 +498,26 @@ def get_response_curves(
     band_ids : list of int, optional
         list of band numbers to get curves for
         default: as bandkeys
+    out : ndarray shape(nbands, nvals), optional
+        array to write curves to
 
     Returns
     -------
     wavelength : ndarray shape(nvals)
         wavelength column
-    rcurves : ndarray shape(nvals, nbands)
+    rcurves : ndarray shape(nbands, nvals)
         sensor response curves for all (selected) bands
     """
-    data = get_data_standard_names(sensor)
-    wavelength = data['wavelength']
-    # collect bands specific for each sensor and start and end wavelenghts
-    if bandkeys is not None:
-        pass
-    elif band_ids is not None:
-        all_bands = _get_default_bands(sensor)
-        bandkeys = [all_bands[i] for i in band_ids]
-    elif pan_only:
-        bandkeys = ['pan']
+    table = _get_curve_table(sensor)
+    index = _get_band_index(sensor, pan_only, bandkeys, band_ids)
+    shape = (len(index), table.curves.shape[1])
+    if out is not None and out.shape != shape:
+        raise ValueError('out must have shape {}, got {}.'.format(shape, out.shape))
+    if index and index == list(range(index[0], index[0] + len(index))):
+        rcurves = table.curves[index[0]:index[0] + len(index)]
+        if out is not None:
+            out[...] = rcurves
+            rcurves = out
     else:
-        bandkeys = _get_default_bands(sensor)
-    data_stacked = np.vstack([data[name] for name in bandkeys if name in data.dtype.names])
-    return wavelength, data_stacked
+        rcurves = table.curves.take(index, axis=0, out=out, mode='clip')
+    return table.wavelength, rcurves
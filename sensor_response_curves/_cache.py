@@ -0,0 +1,156 @@
+import collections
+import hashlib
+import threading
+
+import numpy as np
+
+CacheInfo = collections.namedtuple(
+    'CacheInfo', ['hits', 'misses', 'maxsize', 'currsize', 'maxbytes', 'nbytes'])
+
+
+def array_hash(a):
+    """Get hex digest identifying array contents, shape and dtype"""
+    a = np.ascontiguousarray(a)
+    h = hashlib.sha1(a.view(np.uint8).reshape(-1) if a.size else b'')
+    h.update(repr((a.shape, a.dtype.str)).encode('ascii'))
+    return h.hexdigest()
+
+
+def nbytes(value):
+    """Get memory held by arrays in value"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, 'indptr'):
+        # scipy.sparse compressed matrix
+        return value.data.nbytes + value.indices.nbytes + value.indptr.nbytes
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(nbytes(v) for v in value)
+    return 0
+
+
+class LRUCache(object):
+    """Thread-safe least-recently-used mapping
+
+    Every entry carries a stamp (e.g. a file modification time).
+    Looking up a key with a different stamp counts as a miss
+    and drops the stale entry.
+
+    get_or_build builds missing entries once: concurrent callers
+    asking for the same key wait for the first one's result.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        maximum number of entries
+        default: unbounded
+    maxbytes : int, optional
+        maximum memory held by cached arrays
+        default: unbounded
+    """
+
+    def __init__(self, maxsize=None, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self._nbytes = 0
+        self._data = collections.OrderedDict()
+        self._lock = threading.RLock()
+        # per-key [lock, number of callers using it] for entries being built
+        self._building = {}
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, stamp=None):
+        with self._lock:
+            try:
+                entry_stamp, value, size = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            if entry_stamp != stamp:
+                self._pop(key)
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_or_build(self, key, build, stamp=None):
+        """Get value for key, calling build() once if it is missing or stale"""
+        value = self.get(key, stamp=stamp)
+        if value is not None:
+            return value
+        with self._lock:
+            entry = self._building.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                value = self._peek(key, stamp)
+                if value is None:
+                    value = build()
+                    self.put(key, value, stamp=stamp)
+                return value
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._building[key]
+
+    def put(self, key, value, stamp=None):
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            size = nbytes(value)
+            self._data[key] = (stamp, value, size)
+            self._nbytes += size
+            self._evict()
+
+    def set_maxsize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def set_maxbytes(self, maxbytes):
+        with self._lock:
+            self.maxbytes = maxbytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(
+                self.hits, self.misses, self.maxsize, len(self._data),
+                self.maxbytes, self._nbytes)
+
+    def _peek(self, key, stamp):
+        """Get current value for key without touching statistics"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] != stamp:
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def _pop(self, key):
+        _, value, size = self._data.pop(key)
+        self._nbytes -= size
+        return value
+
+    def _evict(self):
+        while self._data and (
+                (self.maxsize is not None and len(self._data) > self.maxsize) or
+                (self.maxbytes is not None and self._nbytes > self.maxbytes)):
+            self._pop(next(iter(self._data)))
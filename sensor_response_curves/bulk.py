@@ -0,0 +1,108 @@
+"""Response curves of many sensors on one common wavelength grid
+
+All curves are stacked into a zero-padded array of shape
+(nsensors, maxbands, nwavelengths), so that all-sensor simulation is
+a single einsum, e.g.
+
+    np.einsum('sbw,pw->psb', curves.rcurves, spectra)
+"""
+import collections
+
+import numpy as np
+
+import sensor_response_curves as srcurves
+from sensor_response_curves import resample
+from sensor_response_curves._cache import LRUCache, array_hash
+
+BulkCurves = collections.namedtuple(
+    'BulkCurves', ['sensors', 'wavelength', 'rcurves', 'mask', 'bandkeys'])
+
+_BULK_CACHE = LRUCache(maxsize=16)
+
+
+def get_common_grid(sensors=None, resolution=1.0):
+    """Get grid spanning the union of the wavelength ranges of sensors
+
+    Parameters
+    ----------
+    sensors : list of str, optional
+        sensor names
+        default: SUPPORTED_SENSORS
+    resolution : float
+        grid step in nm
+
+    Returns
+    -------
+    ndarray
+        wavelength grid
+    """
+    sensors = sensors or srcurves.SUPPORTED_SENSORS
+    ranges = [srcurves.get_response_curves(sensor)[0][[0, -1]] for sensor in sensors]
+    start_wv = min(r[0] for r in ranges)
+    end_wv = max(r[1] for r in ranges)
+    nsteps = int(round((end_wv - start_wv) / resolution)) + 1
+    return np.linspace(start_wv, end_wv, nsteps)
+
+
+def get_all_response_curves(
+        sensors=None, resolution=1.0, target_wavelength=None, kind='slinear'):
+    """Get default band response curves of many sensors on a common grid
+
+    Results are cached until any of the sensors' CSV files change.
+
+    Parameters
+    ----------
+    sensors : list of str, optional
+        sensor names
+        default: SUPPORTED_SENSORS
+    resolution : float
+        step of the common grid spanning all sensors
+        ignored if target_wavelength is given
+    target_wavelength : ndarray shape(nwavelengths), optional
+        common grid to use instead
+    kind : str
+        interpolation algorithm, see resample_response_curves
+
+    Returns
+    -------
+    BulkCurves : namedtuple of read-only arrays
+        sensors : tuple of str
+        wavelength : ndarray shape(nwavelengths)
+        rcurves : ndarray shape(nsensors, maxbands, nwavelengths)
+            zero for padding bands
+        mask : ndarray shape(nsensors, maxbands) of bool
+            valid bands
+        bandkeys : ndarray shape(nsensors, maxbands) of str
+            standard band names, empty for padding bands
+    """
+    sensors = tuple(sensors or srcurves.SUPPORTED_SENSORS)
+    if target_wavelength is None:
+        target_wavelength = get_common_grid(sensors, resolution)
+    target_wavelength = np.asarray(target_wavelength, dtype='float')
+    key = (sensors, kind, array_hash(target_wavelength))
+    stamp = srcurves._stamp(sensors)
+    return _BULK_CACHE.get_or_build(
+        key, lambda: _build_all_response_curves(sensors, target_wavelength, kind),
+        stamp=stamp)
+
+
+def _build_all_response_curves(sensors, target_wavelength, kind):
+    bandkeys = [srcurves._get_defined_default_bands(sensor) for sensor in sensors]
+    maxbands = max(len(keys) for keys in bandkeys)
+    rcurves = np.zeros((len(sensors), maxbands, target_wavelength.size))
+    mask = np.zeros((len(sensors), maxbands), dtype=bool)
+    names = np.full((len(sensors), maxbands), '', dtype='U{}'.format(
+        max(len(key) for keys in bandkeys for key in keys)))
+    for i, sensor in enumerate(sensors):
+        wavelength, sensor_curves = srcurves.get_response_curves(sensor)
+        _, rcurves[i, :len(sensor_curves)] = resample.resample_response_curves(
+            wavelength, np.nan_to_num(sensor_curves), kind=kind,
+            target_wavelength=target_wavelength)
+        mask[i, :len(sensor_curves)] = True
+        names[i, :len(sensor_curves)] = bandkeys[i]
+    return BulkCurves(
+        sensors=sensors,
+        wavelength=srcurves._make_readonly(target_wavelength.copy()),
+        rcurves=srcurves._make_readonly(rcurves),
+        mask=srcurves._make_readonly(mask),
+        bandkeys=srcurves._make_readonly(names))
@@ -0,0 +1,218 @@
+"""Binary bundle of the parsed response curve files
+
+The bundle is a directory holding one ``.npy`` file per sensor and an
+``index.json`` with the SHA-1 of the CSV file each array was parsed from.
+Arrays are memory-mapped on load, so processes loading the same sensor
+share pages through the OS page cache.
+
+The CSV files in the package remain the source of truth: an entry is
+rebuilt whenever the hash of its source file changes.
+
+Build the bundle ahead of time with::
+
+    python -m sensor_response_curves.bundle [bundle_dir]
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+BUNDLE_DIR_ENV = 'SENSOR_RESPONSE_CURVES_BUNDLE_DIR'
+INDEX_NAME = 'index.json'
+
+# serializes index updates between threads of this process
+_INDEX_LOCK = threading.RLock()
+
+
+def get_bundle_dir():
+    """Get bundle directory
+
+    Taken from the environment variable SENSOR_RESPONSE_CURVES_BUNDLE_DIR
+    if set, otherwise a directory in the user cache.
+    An empty environment variable disables the bundle.
+
+    Returns
+    -------
+    str or None
+        bundle directory, None if disabled
+    """
+    bundle_dir = os.environ.get(BUNDLE_DIR_ENV)
+    if bundle_dir is not None:
+        return bundle_dir or None
+    cache_home = os.environ.get(
+        'XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_home, 'sensor_response_curves')
+
+
+def file_hash(path):
+    """Get SHA-1 hex digest of file contents"""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _file_stat(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime
+
+
+def _read_index(bundle_dir):
+    try:
+        with open(os.path.join(bundle_dir, INDEX_NAME)) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def _atomic_write(path, write):
+    dirname = os.path.dirname(path)
+    fd, tmpfile = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmpfile, path)
+    except BaseException:
+        if os.path.exists(tmpfile):
+            os.remove(tmpfile)
+        raise
+
+
+def _write_index(bundle_dir, index):
+    data = json.dumps(index, indent=1, sort_keys=True).encode('utf-8')
+    _atomic_write(os.path.join(bundle_dir, INDEX_NAME), lambda f: f.write(data))
+
+
+def _update_index(bundle_dir, entries):
+    with _INDEX_LOCK:
+        index = _read_index(bundle_dir)
+        index.update(entries)
+        _write_index(bundle_dir, index)
+
+
+def _is_current(entry, csvfile):
+    """Check index entry against source file, comparing hashes if stat differs"""
+    if entry is None:
+        return False
+    size, mtime = _file_stat(csvfile)
+    if entry['size'] == size and entry['mtime'] == mtime:
+        return True
+    if entry['sha1'] == file_hash(csvfile):
+        entry['size'], entry['mtime'] = size, mtime
+        return True
+    return False
+
+
+def _source_entry(csvfile):
+    """Get index entry describing csvfile, taken before parsing it"""
+    size, mtime = _file_stat(csvfile)
+    return {
+        'sha1': file_hash(csvfile),
+        'size': size,
+        'mtime': mtime}
+
+
+def _write_entry(bundle_dir, name, entry, data):
+    """Write parsed data to bundle and complete its index entry"""
+    if not os.path.isdir(bundle_dir):
+        os.makedirs(bundle_dir)
+    _atomic_write(
+        os.path.join(bundle_dir, name + '.npy'),
+        lambda f: np.save(f, data, allow_pickle=False))
+    entry['shape'] = list(data.shape)
+    return entry
+
+
+def _load_npy(npyfile):
+    try:
+        return np.load(npyfile, mmap_mode='r', allow_pickle=False)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def load_array(name, csvfile, parse, bundle_dir=None):
+    """Memory-map bundled array, (re)building it from csvfile if needed
+
+    Parameters
+    ----------
+    name : str
+        entry name in bundle (sensor name)
+    csvfile : str
+        source file
+    parse : callable
+        function parsing csvfile to ndarray
+    bundle_dir : str, optional
+        bundle directory
+        default: get_bundle_dir()
+
+    Returns
+    -------
+    numpy.memmap or ndarray
+        read-only memory-mapped array,
+        parsed array if the bundle cannot be written or read
+    """
+    bundle_dir = bundle_dir or get_bundle_dir()
+    npyfile = os.path.join(bundle_dir, name + '.npy')
+    index = _read_index(bundle_dir)
+    entry = index.get(name)
+    stat = entry and (entry['size'], entry['mtime'])
+    if _is_current(entry, csvfile):
+        data = _load_npy(npyfile)
+        if data is not None and list(data.shape) == entry['shape']:
+            if (entry['size'], entry['mtime']) != stat:
+                # source was touched but not changed
+                try:
+                    _update_index(bundle_dir, {name: entry})
+                except (IOError, OSError):
+                    pass
+            return data
+    entry = _source_entry(csvfile)
+    data = parse(csvfile)
+    try:
+        _update_index(bundle_dir, {name: _write_entry(bundle_dir, name, entry, data)})
+    except (IOError, OSError):
+        # bundle directory not writable, e.g. in a read-only container
+        return data
+    mapped = _load_npy(npyfile)
+    return data if mapped is None else mapped
+
+
+def build_bundle(sensors=None, bundle_dir=None):
+    """Build or refresh the bundle for the given sensors
+
+    Parameters
+    ----------
+    sensors : list of str, optional
+        sensors to include
+        default: SUPPORTED_SENSORS
+    bundle_dir : str, optional
+        bundle directory
+        default: get_bundle_dir()
+
+    Returns
+    -------
+    str
+        bundle directory
+    """
+    from . import SUPPORTED_SENSORS, _get_csv_file, _parse_csv
+    bundle_dir = bundle_dir or get_bundle_dir()
+    if bundle_dir is None:
+        raise ValueError('Bundle is disabled and no bundle_dir given.')
+    index = _read_index(bundle_dir)
+    entries = {}
+    for sensor in sensors or SUPPORTED_SENSORS:
+        csvfile = _get_csv_file(sensor)
+        entry = index.get(sensor)
+        if _is_current(entry, csvfile):
+            entries[sensor] = entry
+        else:
+            entries[sensor] = _write_entry(
+                bundle_dir, sensor, _source_entry(csvfile), _parse_csv(csvfile))
+    _update_index(bundle_dir, entries)
+    return bundle_dir
+
+
+if __name__ == '__main__':
+    import sys
+    print(build_bundle(bundle_dir=(sys.argv[1] if len(sys.argv) > 1 else None)))
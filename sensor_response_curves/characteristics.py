@@ -0,0 +1,136 @@
+"""Spectral characteristics of response curves
+
+All characteristics are computed for all bands of a curve array at
+once. Cut-on and cut-off wavelengths are where a curve first and last
+reaches a fraction of its peak, interpolated between samples.
+"""
+import collections
+
+import numpy as np
+
+import sensor_response_curves as srcurves
+from sensor_response_curves import support
+
+BandCharacteristics = collections.namedtuple(
+    'BandCharacteristics', [
+        'bandkeys', 'peak', 'centre', 'centroid', 'fwhm', 'equivalent_width',
+        'cut_on_50', 'cut_off_50', 'cut_on_1', 'cut_off_1'])
+
+
+def crossings(wavelength, rcurves, level):
+    """Get first and last wavelength where each curve reaches level times its peak
+
+    Parameters
+    ----------
+    wavelength : ndarray shape(nvals)
+        wavelength
+    rcurves : ndarray shape(nbands, nvals)
+        response curves
+    level : float
+        fraction of the peak response
+
+    Returns
+    -------
+    cut_on, cut_off : ndarray shape(nbands)
+        crossing wavelengths, linearly interpolated between samples
+    """
+    wavelength = np.asarray(wavelength, dtype='float')
+    rcurves = np.atleast_2d(rcurves)
+    nvals = rcurves.shape[1]
+    threshold = level * rcurves.max(axis=1)
+    start, stop = support.mask_support(rcurves >= threshold[:, None])
+    rows = np.arange(rcurves.shape[0])
+
+    def interpolate(i0, i1):
+        r0 = rcurves[rows, i0]
+        r1 = rcurves[rows, i1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            t = np.where(r1 != r0, (threshold - r0) / (r1 - r0), 0.0)
+        return wavelength[i0] + np.clip(t, 0, 1) * (wavelength[i1] - wavelength[i0])
+
+    last = stop - 1
+    cut_on = interpolate(np.maximum(start - 1, 0), start)
+    cut_off = interpolate(np.minimum(last + 1, nvals - 1), last)
+    return cut_on, cut_off
+
+
+def band_characteristics(wavelength, rcurves, bandkeys=None):
+    """Compute characteristics of response curves
+
+    NaN values in rcurves are treated as zero.
+
+    Parameters
+    ----------
+    wavelength : ndarray shape(nvals)
+        wavelength
+    rcurves : ndarray shape(nbands, nvals)
+        response curves
+    bandkeys : sequence of str, optional
+        band names to include in the result
+
+    Returns
+    -------
+    BandCharacteristics : namedtuple of ndarray shape(nbands)
+        peak : wavelength of maximum response
+        centre : midpoint of the 50 % cut-on and cut-off
+        centroid : response-weighted mean wavelength
+        fwhm : full width at half maximum
+        equivalent_width : integral of the response divided by its peak
+        cut_on_50, cut_off_50 : half-maximum crossings
+        cut_on_1, cut_off_1 : 1 % crossings
+    """
+    from sensor_response_curves.convolution import trapezoid_weights
+    wavelength = np.asarray(wavelength, dtype='float')
+    rcurves = np.nan_to_num(np.atleast_2d(rcurves))
+    weights = trapezoid_weights(wavelength)
+    area = np.dot(rcurves, weights)
+    maximum = rcurves.max(axis=1)
+    cut_on_50, cut_off_50 = crossings(wavelength, rcurves, 0.5)
+    cut_on_1, cut_off_1 = crossings(wavelength, rcurves, 0.01)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centroid = np.dot(rcurves, weights * wavelength) / area
+        equivalent_width = area / maximum
+    return BandCharacteristics(
+        bandkeys=tuple(bandkeys) if bandkeys is not None else None,
+        peak=wavelength[rcurves.argmax(axis=1)],
+        centre=(cut_on_50 + cut_off_50) / 2,
+        centroid=centroid,
+        fwhm=cut_off_50 - cut_on_50,
+        equivalent_width=equivalent_width,
+        cut_on_50=cut_on_50,
+        cut_off_50=cut_off_50,
+        cut_on_1=cut_on_1,
+        cut_off_1=cut_off_1)
+
+
+def get_band_characteristics(sensor, pan_only=False, bandkeys=None, band_ids=None):
+    """Get characteristics of the response curves of a sensor
+
+    Computed once for all bands and cached per sensor.
+
+    Parameters
+    ----------
+    sensor : str in SUPPORTED_SENSORS
+        sensor name
+    pan_only, bandkeys, band_ids
+        band selection, see get_response_curves
+
+    Returns
+    -------
+    BandCharacteristics
+        see band_characteristics
+    """
+    allbands = srcurves._cached(sensor, 'characteristics', _build_characteristics)
+    index = srcurves._get_band_index(sensor, pan_only, bandkeys, band_ids)
+    return BandCharacteristics(
+        bandkeys=tuple(allbands.bandkeys[i] for i in index),
+        **{field: getattr(allbands, field)[index]
+           for field in BandCharacteristics._fields if field != 'bandkeys'})
+
+
+def _build_characteristics(sensor):
+    table = srcurves._get_curve_table(sensor)
+    result = band_characteristics(table.wavelength, table.curves, bandkeys=table.bandkeys)
+    for a in result[1:]:
+        srcurves._make_readonly(a)
+    return result
@@ -0,0 +1,379 @@
+"""Band-equivalent values of spectra through sensor response curves
+
+The band value of a spectrum S for a band with response R is
+
+    integral(R * S) / integral(R)
+
+over the wavelength grid of the spectrum. With the response curves
+interpolated onto that grid and trapezoidal quadrature, this is one
+matrix product of the spectra with a kernel of shape (nbands, nwavelengths).
+
+Kernels are cached by sensor, bands and wavelength grid, so repeated
+convolutions against the same instrument grid only pay for the product.
+
+On fine grids most kernel entries are zero. A CSR kernel holding only
+the support of each band is then used for wavelength-major spectra
+(e.g. the transpose of a band-sequential block), where the sparse
+product reads only the wavelength rows inside the band supports.
+"""
+import numpy as np
+
+import sensor_response_curves as srcurves
+from sensor_response_curves import resample
+from sensor_response_curves import support
+from sensor_response_curves._cache import LRUCache, array_hash
+
+DEFAULT_KERNEL_CACHE_BYTES = 256 * 2 ** 20
+
+# kernel density below which the sparse kernel is used
+SPARSE_DENSITY_THRESHOLD = 0.1
+
+_KERNEL_CACHE = LRUCache(maxbytes=DEFAULT_KERNEL_CACHE_BYTES)
+
+
+def clear_kernel_cache():
+    """Remove all kernels from the cache and reset its counters"""
+    _KERNEL_CACHE.clear()
+
+
+def kernel_cache_info():
+    """Get statistics of the kernel cache
+
+    Returns
+    -------
+    CacheInfo : namedtuple
+        hits, misses, maxsize, currsize, maxbytes and nbytes
+    """
+    return _KERNEL_CACHE.info()
+
+
+def set_kernel_cache_limits(maxsize=None, maxbytes=DEFAULT_KERNEL_CACHE_BYTES):
+    """Set limits of the kernel cache
+
+    Least recently used kernels are evicted first.
+
+    Parameters
+    ----------
+    maxsize : int or None
+        maximum number of kernels
+    maxbytes : int or None
+        memory budget for kernels
+    """
+    _KERNEL_CACHE.set_maxsize(maxsize)
+    _KERNEL_CACHE.set_maxbytes(maxbytes)
+
+
+def trapezoid_weights(wavelength):
+    """Get trapezoidal quadrature weights for wavelength grid
+
+    Parameters
+    ----------
+    wavelength : ndarray shape(nwavelengths)
+        wavelength grid
+
+    Returns
+    -------
+    ndarray shape(nwavelengths)
+        weights w such that sum(w * y) is the trapezoidal integral of y
+    """
+    wavelength = np.asarray(wavelength, dtype='float')
+    weights = np.zeros_like(wavelength)
+    if wavelength.size > 1:
+        dx = np.diff(wavelength) / 2
+        weights[:-1] += dx
+        weights[1:] += dx
+    return weights
+
+
+def build_kernel(sensor, wavelength, bandkeys=None, kind='slinear'):
+    """Build convolution kernel for sensor on wavelength grid
+
+    Parameters
+    ----------
+    sensor : str in SUPPORTED_SENSORS
+        sensor name
+    wavelength : ndarray shape(nwavelengths)
+        wavelength grid of the spectra
+    bandkeys : list of str, optional
+        bands to get kernel for
+        default: BAND_SEQUENCE for the sensor group
+    kind : str
+        interpolation algorithm for response curves
+
+    Returns
+    -------
+    kernel : ndarray shape(nbands, nwavelengths)
+        quadrature weighted response curves, each row summing to one
+        rows of bands outside the wavelength grid are NaN
+    """
+    wavelength = np.asarray(wavelength, dtype='float')
+    srf_wavelength, rcurves = srcurves.get_response_curves(sensor, bandkeys=bandkeys)
+    rcurves = resample._interpolate(
+        srf_wavelength, np.nan_to_num(rcurves), wavelength, kind=kind)
+    kernel = rcurves * trapezoid_weights(wavelength)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        kernel /= kernel.sum(axis=1, keepdims=True)
+    return kernel
+
+
+def build_sparse_kernel(kernel):
+    """Get CSR matrix holding the support window of each kernel row
+
+    Parameters
+    ----------
+    kernel : ndarray shape(nbands, nwavelengths)
+        dense kernel
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix shape(nbands, nwavelengths)
+    """
+    import scipy.sparse
+    start, stop = support.mask_support(kernel != 0)
+    indptr = np.concatenate([[0], np.cumsum(stop - start)])
+    indices = np.concatenate(
+        [np.arange(i0, i1) for i0, i1 in zip(start, stop)] + [np.zeros(0, dtype='intp')])
+    data = np.concatenate(
+        [row[i0:i1] for row, i0, i1 in zip(kernel, start, stop)] + [np.zeros(0)])
+    return scipy.sparse.csr_matrix((data, indices, indptr), shape=kernel.shape)
+
+
+def kernel_density(kernel):
+    """Get fraction of non-zero kernel entries"""
+    if hasattr(kernel, 'nnz'):
+        return kernel.nnz / max(np.prod(kernel.shape), 1)
+    return np.count_nonzero(kernel) / max(kernel.size, 1)
+
+
+def get_kernel(sensor, wavelength, bandkeys=None, kind='slinear', sparse=False):
+    """Get cached convolution kernel for sensor on wavelength grid
+
+    See build_kernel for parameters.
+
+    Parameters
+    ----------
+    sparse : bool
+        get CSR kernel from build_sparse_kernel
+
+    Returns
+    -------
+    kernel : ndarray or scipy.sparse.csr_matrix shape(nbands, nwavelengths)
+        read-only kernel
+    """
+    bandkeys = tuple(srcurves._get_bandkeys(sensor, bandkeys=bandkeys))
+    key = (
+        sensor, bandkeys, kind, array_hash(np.asarray(wavelength, dtype='float')),
+        sparse)
+    return _KERNEL_CACHE.get_or_build(
+        key, lambda: _build_cached_kernel(sensor, wavelength, list(bandkeys), kind, sparse),
+        stamp=srcurves._stamp([sensor]))
+
+
+def _build_cached_kernel(sensor, wavelength, bandkeys, kind, sparse):
+    if sparse:
+        dense = get_kernel(sensor, wavelength, bandkeys=bandkeys, kind=kind)
+        kernel = build_sparse_kernel(dense)
+        srcurves._make_readonly(kernel.data)
+        return kernel
+    return srcurves._make_readonly(
+        build_kernel(sensor, wavelength, bandkeys=bandkeys, kind=kind))
+
+
+def _dot_support(spectra, kernel):
+    """Get np.dot(spectra, kernel.T), ignoring non-finite spectra outside band supports
+
+    Pixels with NaN results are recomputed with non-finite values set
+    to zero; bands with such values inside their support are NaN,
+    as in the sparse product.
+    """
+    values = np.dot(spectra, kernel.T)
+    finite_rows = np.isfinite(kernel).all(axis=1)
+    bad = np.isnan(values[..., finite_rows]).any(axis=-1)
+    if np.any(bad):
+        block = spectra[bad]
+        invalid = ~np.isfinite(block)
+        fixed = np.dot(np.where(invalid, 0, block), kernel.T)
+        fixed[np.dot(invalid, (kernel != 0).T)] = np.nan
+        values[bad] = fixed
+    return values
+
+
+def _is_wavelength_major(spectra):
+    return spectra.ndim == 2 and spectra.T.flags.c_contiguous and spectra.shape[0] > 1
+
+
+def convolve(sensor, wavelength, spectra, bandkeys=None, sparse=None):
+    """Get band-equivalent values of spectra for sensor
+
+    Parameters
+    ----------
+    sensor : str in SUPPORTED_SENSORS
+        sensor name
+    wavelength : ndarray shape(nwavelengths)
+        wavelength grid of the spectra in nm
+    spectra : ndarray shape(npixels, nwavelengths) or shape(nwavelengths)
+        spectra to convolve
+        NaN (e.g. bad bands) outside the support of a band is ignored,
+        NaN inside the support of a band makes that band NaN
+    bandkeys : list of str, optional
+        bands to compute
+        default: BAND_SEQUENCE for the sensor group
+    sparse : bool, optional
+        use CSR kernel
+        default: if spectra are wavelength-major (Fortran order)
+                 and kernel density is below SPARSE_DENSITY_THRESHOLD
+
+    Returns
+    -------
+    ndarray shape(npixels, nbands) or shape(nbands)
+        response-weighted band values
+    """
+    spectra = np.asarray(spectra)
+    if spectra.shape[-1] != len(wavelength):
+        raise ValueError(
+            'Last axis of spectra must match wavelength ({} != {}).'
+            ''.format(spectra.shape[-1], len(wavelength)))
+    kernel = get_kernel(sensor, wavelength, bandkeys=bandkeys)
+    if sparse is None:
+        sparse = (
+            _is_wavelength_major(spectra) and
+            kernel_density(kernel) < SPARSE_DENSITY_THRESHOLD)
+    if sparse:
+        kernel = get_kernel(sensor, wavelength, bandkeys=bandkeys, sparse=True)
+        return kernel.dot(spectra.T).T
+    return _dot_support(spectra, kernel)
+
+
+def get_stacked_kernel(sensors, wavelength, kind='slinear'):
+    """Get cached kernel of the default bands of many sensors
+
+    Parameters
+    ----------
+    sensors : list of str
+        sensor names
+    wavelength : ndarray shape(nwavelengths)
+        wavelength grid of the spectra
+    kind : str
+        interpolation algorithm for response curves
+
+    Returns
+    -------
+    kernel : ndarray shape(nbands_total, nwavelengths)
+        read-only kernels of all sensors, one after the other
+    offsets : ndarray shape(nsensors + 1)
+        rows offsets[i]:offsets[i + 1] belong to sensors[i]
+    """
+    sensors = tuple(sensors)
+    key = ('stacked', sensors, kind, array_hash(np.asarray(wavelength, dtype='float')))
+    stamp = srcurves._stamp(sensors)
+    return _KERNEL_CACHE.get_or_build(
+        key, lambda: _build_stacked_kernel(sensors, wavelength, kind), stamp=stamp)
+
+
+def _build_stacked_kernel(sensors, wavelength, kind):
+    kernels = [get_kernel(sensor, wavelength, kind=kind) for sensor in sensors]
+    offsets = np.concatenate([[0], np.cumsum([len(k) for k in kernels])])
+    kernel = np.concatenate(kernels, axis=0) if kernels else np.zeros((0, len(wavelength)))
+    return srcurves._make_readonly(kernel), srcurves._make_readonly(offsets)
+
+
+def convolve_sensors(sensors, wavelength, spectra):
+    """Get band-equivalent values of spectra for many sensors in one product
+
+    Parameters
+    ----------
+    sensors : list of str
+        sensor names
+    wavelength : ndarray shape(nwavelengths)
+        wavelength grid of the spectra in nm
+    spectra : ndarray shape(npixels, nwavelengths) or shape(nwavelengths)
+        spectra to convolve
+
+    Returns
+    -------
+    dict of ndarray shape(npixels, nbands) or shape(nbands)
+        band values of the default bands per sensor
+        views into one array holding all sensors
+    """
+    spectra = np.asarray(spectra)
+    if spectra.shape[-1] != len(wavelength):
+        raise ValueError(
+            'Last axis of spectra must match wavelength ({} != {}).'
+            ''.format(spectra.shape[-1], len(wavelength)))
+    kernel, offsets = get_stacked_kernel(sensors, wavelength)
+    values = _dot_support(spectra, kernel)
+    return {
+        sensor: values[..., offsets[i]:offsets[i + 1]]
+        for i, sensor in enumerate(sensors)}
+
+
+def convolve_mixed(sensors, wavelength, spectra, sensor_index, bandkeys=None):
+    """Get band-equivalent values of spectra from different sensors
+
+    Pixels are grouped by sensor and each group is convolved with one
+    product against the kernel of its sensor.
+
+    Parameters
+    ----------
+    sensors : list of str
+        sensor names
+    wavelength : ndarray shape(nwavelengths)
+        wavelength grid of the spectra in nm
+    spectra : ndarray shape(..., nwavelengths)
+        spectra to convolve
+    sensor_index : ndarray, shape of spectra without last axis
+        index into sensors per pixel, integer or integer-valued float
+        pixels with an index outside sensors (e.g. -1 or NaN) are NaN
+    bandkeys : list of str, optional
+        standard band names to compute
+        default: union of the default bands of sensors
+
+    Returns
+    -------
+    values : ndarray shape(..., nbands)
+        response-weighted band values,
+        NaN where the sensor of a pixel has no such band
+    bandkeys : list of str
+        band names along the last axis of values
+    """
+    spectra = np.asarray(spectra)
+    sensor_index = np.asarray(sensor_index)
+    if spectra.shape[-1] != len(wavelength):
+        raise ValueError(
+            'Last axis of spectra must match wavelength ({} != {}).'
+            ''.format(spectra.shape[-1], len(wavelength)))
+    if sensor_index.shape != spectra.shape[:-1]:
+        raise ValueError(
+            'sensor_index must have shape {}, got {}.'
+            ''.format(spectra.shape[:-1], sensor_index.shape))
+    if bandkeys is None:
+        bandkeys = []
+        for sensor in sensors:
+            for key in srcurves._get_defined_default_bands(sensor):
+                if key not in bandkeys:
+                    bandkeys.append(key)
+    shape = sensor_index.shape + (len(bandkeys),)
+    spectra = spectra.reshape(-1, spectra.shape[-1])
+    sensor_index = sensor_index.reshape(-1)
+    values = np.full((len(spectra), len(bandkeys)), np.nan)
+    with np.errstate(invalid='ignore'):
+        valid = (sensor_index >= 0) & (sensor_index < len(sensors))
+    pixels = np.flatnonzero(valid)
+    pixel_sensors = sensor_index[pixels]
+    if np.any(pixel_sensors != np.floor(pixel_sensors)):
+        raise ValueError('sensor_index must hold integer values.')
+    pixel_sensors = pixel_sensors.astype('intp')
+    order = np.argsort(pixel_sensors, kind='stable')
+    pixels = pixels[order]
+    bounds = np.concatenate([[0], np.cumsum(
+        np.bincount(pixel_sensors[order], minlength=len(sensors)))])
+    for i, sensor in enumerate(sensors):
+        group = pixels[bounds[i]:bounds[i + 1]]
+        band_index = srcurves._get_curve_table(sensor).band_index
+        columns = [j for j, key in enumerate(bandkeys) if key in band_index]
+        if not len(group) or not columns:
+            continue
+        kernel = get_kernel(
+            sensor, wavelength, bandkeys=[bandkeys[j] for j in columns])
+        values[np.ix_(group, columns)] = _dot_support(spectra[group], kernel)
+    return values.reshape(shape), bandkeys
@@ -0,0 +1,179 @@
+"""Chunked convolution of memory-mapped hyperspectral cubes
+
+Cubes are read through np.memmap in one of the storage orders
+
+    bsq : (nbands, nrows, ncols)
+    bil : (nrows, nbands, ncols)
+    bip : (nrows, ncols, nbands)
+
+and processed in blocks of rows sized to a memory budget.
+Output is band-interleaved by pixel, (nrows, ncols, nbands).
+"""
+import numpy as np
+
+from sensor_response_curves import convolution
+
+INTERLEAVES = ('bsq', 'bil', 'bip')
+
+DEFAULT_MAX_BYTES = 256 * 2 ** 20
+
+# axes of (rows, cols, bands) in storage order
+_AXES = {
+    'bsq': (1, 2, 0),
+    'bil': (0, 2, 1),
+    'bip': (0, 1, 2)}
+
+
+def _check_interleave(interleave):
+    if interleave not in INTERLEAVES:
+        raise ValueError(
+            'Interleave \'{}\' is not supported. Choose from {}.'
+            ''.format(interleave, INTERLEAVES))
+
+
+def _storage_shape(shape, interleave):
+    nrows, ncols, nbands = shape
+    return {
+        'bsq': (nbands, nrows, ncols),
+        'bil': (nrows, nbands, ncols),
+        'bip': (nrows, ncols, nbands)}[interleave]
+
+
+def open_cube(path, shape=None, dtype=None, interleave='bip', offset=0):
+    """Memory-map hyperspectral cube read-only
+
+    Parameters
+    ----------
+    path : str
+        .npy file or raw binary file
+    shape : tuple (nrows, ncols, nbands), optional
+        cube shape, required for raw files
+    dtype : numpy dtype, optional
+        data type, required for raw files
+    interleave : str in INTERLEAVES
+        storage order
+    offset : int
+        header bytes to skip in raw files
+
+    Returns
+    -------
+    numpy.memmap
+        cube in storage order
+    """
+    _check_interleave(interleave)
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='r')
+    if shape is None or dtype is None:
+        raise ValueError('shape and dtype are required for raw cubes.')
+    return np.memmap(
+        path, dtype=dtype, mode='r', offset=offset,
+        shape=_storage_shape(shape, interleave))
+
+
+def cube_shape(cube, interleave='bip'):
+    """Get (nrows, ncols, nbands) of cube in given storage order"""
+    _check_interleave(interleave)
+    return tuple(cube.shape[i] for i in _AXES[interleave])
+
+
+def rows_per_chunk(ncols, nwavelengths, nbands, itemsize, max_bytes=DEFAULT_MAX_BYTES):
+    """Get number of rows processed at once within max_bytes
+
+    Accounts for the input block, its float64 pixel-major copy
+    and the float64 result. At least one row is returned.
+    """
+    bytes_per_row = ncols * (nwavelengths * (itemsize + 8) + nbands * 8)
+    return max(1, int(max_bytes // bytes_per_row))
+
+
+def iter_convolved_chunks(
+        sensor, wavelength, cube, interleave='bip', bandkeys=None,
+        max_bytes=DEFAULT_MAX_BYTES):
+    """Convolve cube with sensor response curves block by block
+
+    Parameters
+    ----------
+    sensor : str in SUPPORTED_SENSORS
+        sensor name
+    wavelength : ndarray shape(nwavelengths)
+        wavelength of the cube bands in nm
+    cube : ndarray
+        cube in storage order, e.g. from open_cube
+    interleave : str in INTERLEAVES
+        storage order of cube
+    bandkeys : list of str, optional
+        bands to simulate
+        default: BAND_SEQUENCE for the sensor group
+    max_bytes : int
+        memory budget per block
+
+    Yields
+    ------
+    rows : slice
+        rows of the block
+    values : ndarray shape(nrows_block, ncols, nbands)
+        band values of the block
+    """
+    nrows, ncols, nwavelengths = cube_shape(cube, interleave)
+    if nwavelengths != len(wavelength):
+        raise ValueError(
+            'Cube has {} bands but {} wavelengths were given.'
+            ''.format(nwavelengths, len(wavelength)))
+    kernel = convolution.get_kernel(sensor, wavelength, bandkeys=bandkeys)
+    nbands = kernel.shape[0]
+    step = rows_per_chunk(ncols, nwavelengths, nbands, cube.dtype.itemsize, max_bytes)
+    row_axis = _AXES[interleave][0]
+    for start in range(0, nrows, step):
+        rows = slice(start, min(start + step, nrows))
+        index = [slice(None)] * 3
+        index[row_axis] = rows
+        block = np.asarray(cube[tuple(index)]).transpose(_AXES[interleave])
+        spectra = block.reshape(-1, nwavelengths).astype('float')
+        values = convolution._dot_support(spectra, kernel)
+        yield rows, values.reshape(rows.stop - rows.start, ncols, nbands)
+
+
+def convolve_cube(
+        sensor, wavelength, cube, out, interleave='bip', bandkeys=None,
+        max_bytes=DEFAULT_MAX_BYTES, dtype='float32'):
+    """Convolve cube with sensor response curves into memory-mapped output
+
+    Parameters
+    ----------
+    sensor : str in SUPPORTED_SENSORS
+        sensor name
+    wavelength : ndarray shape(nwavelengths)
+        wavelength of the cube bands in nm
+    cube : str or ndarray
+        .npy file or cube in storage order, e.g. from open_cube
+    out : str or ndarray shape(nrows, ncols, nbands)
+        .npy file to create or array to write to
+    interleave : str in INTERLEAVES
+        storage order of cube
+    bandkeys : list of str, optional
+        bands to simulate
+        default: BAND_SEQUENCE for the sensor group
+    max_bytes : int
+        memory budget per block
+    dtype : numpy dtype
+        data type of new output file
+
+    Returns
+    -------
+    ndarray shape(nrows, ncols, nbands)
+        output, memory-mapped if created from a path
+    """
+    if isinstance(cube, str):
+        cube = open_cube(cube, interleave=interleave)
+    if isinstance(out, str):
+        nrows, ncols, _ = cube_shape(cube, interleave)
+        nbands = convolution.get_kernel(sensor, wavelength, bandkeys=bandkeys).shape[0]
+        out = np.lib.format.open_memmap(
+            out, mode='w+', dtype=dtype, shape=(nrows, ncols, nbands))
+    for rows, values in iter_convolved_chunks(
+            sensor, wavelength, cube, interleave=interleave, bandkeys=bandkeys,
+            max_bytes=max_bytes):
+        out[rows] = values
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
@@ -0,0 +1,118 @@
+"""Band integration of N-dimensional lookup tables
+
+Any axis of an array, e.g. the wavelength axis of a radiative transfer
+LUT of shape (aot, wv, sza, vza, raa, nwavelengths), is contracted
+against the convolution kernel of a sensor. The kernel interpolates the
+response curves onto the LUT grid as resample_response_curves does.
+
+The other axes are processed in blocks sized to a memory budget,
+optionally in a thread pool (numpy releases the GIL in the product).
+"""
+import concurrent.futures
+
+import numpy as np
+
+from sensor_response_curves import convolution
+
+DEFAULT_MAX_BYTES = 256 * 2 ** 20
+
+
+def iter_blocks(shape, row_bytes, max_bytes=DEFAULT_MAX_BYTES):
+    """Split the leading axes of shape into blocks within max_bytes
+
+    Parameters
+    ----------
+    shape : tuple of int
+        array shape, the last axis is never split
+    row_bytes : int
+        memory needed per element of shape[:-1]
+    max_bytes : int
+        memory budget per block
+
+    Yields
+    ------
+    tuple
+        index into shape[:-1] selecting one block
+    """
+    outer = shape[:-1]
+    k = len(outer)
+    inner = 1
+    while k > 0 and inner * outer[k - 1] * row_bytes <= max_bytes:
+        k -= 1
+        inner *= outer[k]
+    if k == 0:
+        yield ()
+        return
+    step = max(1, int(max_bytes // (inner * row_bytes)))
+    for index in np.ndindex(*outer[:k - 1]):
+        for start in range(0, outer[k - 1], step):
+            yield index + (slice(start, min(start + step, outer[k - 1])),)
+
+
+def integrate_lut(
+        sensor, wavelength, lut, axis=-1, bandkeys=None, kind='slinear',
+        out=None, max_bytes=DEFAULT_MAX_BYTES, workers=None):
+    """Band-integrate array along its wavelength axis
+
+    Parameters
+    ----------
+    sensor : str in SUPPORTED_SENSORS
+        sensor name
+    wavelength : ndarray shape(nwavelengths)
+        wavelength grid of the LUT in nm
+    lut : ndarray
+        array with nwavelengths along axis, e.g. memory-mapped
+    axis : int
+        wavelength axis
+    bandkeys : list of str, optional
+        bands to compute
+        default: BAND_SEQUENCE for the sensor group
+    kind : str
+        interpolation algorithm for response curves,
+        see resample_response_curves
+    out : ndarray, optional
+        array to write to, shape of lut with nbands along axis
+        default: new float64 array
+    max_bytes : int
+        memory budget per block
+    workers : int, optional
+        number of threads
+        default: process blocks in the calling thread
+
+    Returns
+    -------
+    ndarray
+        band values with the bands along axis
+    """
+    lut = np.asanyarray(lut)
+    axis = axis % lut.ndim
+    if lut.shape[axis] != len(wavelength):
+        raise ValueError(
+            'Axis {} of lut has {} elements but {} wavelengths were given.'
+            ''.format(axis, lut.shape[axis], len(wavelength)))
+    kernel = convolution.get_kernel(sensor, wavelength, bandkeys=bandkeys, kind=kind)
+    nbands = kernel.shape[0]
+    shape = lut.shape[:axis] + (nbands,) + lut.shape[axis + 1:]
+    if out is None:
+        out = np.empty(shape)
+    elif out.shape != shape:
+        raise ValueError('out must have shape {}, got {}.'.format(shape, out.shape))
+    lut_view = np.moveaxis(lut, axis, -1)
+    out_view = np.moveaxis(out, axis, -1)
+    row_bytes = len(wavelength) * (lut.dtype.itemsize + 8) + nbands * 8
+
+    def integrate_block(index):
+        block = np.asarray(lut_view[index], dtype='float')
+        out_view[index] = convolution._dot_support(block, kernel)
+
+    blocks = iter_blocks(lut_view.shape, row_bytes, max_bytes)
+    if workers is None or workers <= 1:
+        for index in blocks:
+            integrate_block(index)
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in executor.map(integrate_block, blocks):
+                pass
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
@@ -0,0 +1,161 @@
+"""Precomputed band metadata for all sensors
+
+The index in data/metadata.json holds, per sensor, the band names,
+native wavelength grid and per-band support, peak, centre and FWHM.
+Queries are answered from the index without parsing the CSV files.
+
+Each sensor entry records the SHA-1 of its CSV file. The hash is
+checked on first use of a sensor; if the file has changed, the entry
+is recomputed from the data instead. Regenerate the index with::
+
+    python -m sensor_response_curves.metadata
+"""
+import copy
+import io
+import json
+import os
+import threading
+
+import numpy as np
+
+import sensor_response_curves as srcurves
+from sensor_response_curves import bundle
+from sensor_response_curves import characteristics
+from sensor_response_curves import support
+
+INDEX_FILE = os.path.join(srcurves.CSVDIR, 'metadata.json')
+
+
+def _load_index():
+    try:
+        with io.open(INDEX_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return {'sensors': {}}
+
+
+_INDEX = _load_index()
+_VERIFIED = set()
+_LOCK = threading.Lock()
+
+
+def compute_sensor_metadata(sensor):
+    """Compute metadata index entry for sensor from its response curves
+
+    Parameters
+    ----------
+    sensor : str in SUPPORTED_SENSORS
+        sensor name
+
+    Returns
+    -------
+    dict
+        index entry, see get_sensor_metadata
+    """
+    table = srcurves._get_curve_table(sensor)
+    wavelength = table.wavelength
+    start, stop = support.band_support(np.nan_to_num(table.curves))
+    chars = characteristics.get_band_characteristics(sensor, bandkeys=table.bandkeys)
+    steps = np.diff(wavelength)
+    bands = {}
+    for i, name in enumerate(table.bandkeys):
+        bands[name] = {
+            'support': [int(start[i]), int(stop[i])],
+            'support_wavelength': [
+                float(wavelength[start[i]]), float(wavelength[max(stop[i] - 1, 0)])],
+            'peak': float(chars.peak[i]),
+            'centre': float(chars.centre[i]),
+            'fwhm': float(chars.fwhm[i])}
+    return {
+        'sha1': bundle.file_hash(srcurves._get_csv_file(sensor)),
+        'group': srcurves.SENSOR_GROUPS[sensor],
+        'bandkeys': list(table.bandkeys),
+        'default_bandkeys': srcurves._get_defined_default_bands(sensor),
+        'wavelength': {
+            'start': float(wavelength[0]),
+            'stop': float(wavelength[-1]),
+            'step': float(steps.min()),
+            'regular': bool(np.all(steps == steps[0])),
+            'size': int(wavelength.size)},
+        'bands': bands}
+
+
+def build_metadata_index(sensors=None):
+    """Compute metadata index for sensors
+
+    Parameters
+    ----------
+    sensors : list of str, optional
+        sensors to include
+        default: SUPPORTED_SENSORS
+
+    Returns
+    -------
+    dict
+        index with one entry per sensor under 'sensors'
+    """
+    sensors = sensors or srcurves.SUPPORTED_SENSORS
+    return {'sensors': {sensor: compute_sensor_metadata(sensor) for sensor in sensors}}
+
+
+def write_metadata_index(path=INDEX_FILE):
+    """Regenerate the metadata index file for all sensors"""
+    index = build_metadata_index()
+    with io.open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(index, indent=1, sort_keys=True, ensure_ascii=False))
+        f.write(u'\n')
+    return path
+
+
+def get_sensor_metadata(sensor):
+    """Get metadata of sensor
+
+    Parameters
+    ----------
+    sensor : str in SUPPORTED_SENSORS
+        sensor name
+
+    Returns
+    -------
+    dict
+        copy of the index entry
+        sha1 : hash of the CSV file
+        group : sensor group
+        bandkeys : all bands in the file
+        default_bandkeys : bands returned by get_response_curves by default
+        wavelength : native grid start, stop, step (smallest), regular, size
+        bands : per band
+            support : index window [start, stop) of non-zero response
+            support_wavelength : first and last wavelength in support
+            peak : wavelength of maximum response
+            centre : midpoint of the half-maximum crossings
+            fwhm : full width at half maximum
+    """
+    return copy.deepcopy(_get_entry(sensor))
+
+
+def _get_entry(sensor):
+    """Get index entry of sensor, verified against its CSV file on first use"""
+    srcurves._check_supported_sensor(sensor)
+    with _LOCK:
+        if sensor not in _VERIFIED:
+            entry = _INDEX['sensors'].get(sensor)
+            sha1 = bundle.file_hash(srcurves._get_csv_file(sensor))
+            if entry is None or entry['sha1'] != sha1:
+                _INDEX['sensors'][sensor] = compute_sensor_metadata(sensor)
+            _VERIFIED.add(sensor)
+        return _INDEX['sensors'][sensor]
+
+
+def get_band_metadata(sensor, band):
+    """Get metadata of a band of sensor, see get_sensor_metadata"""
+    bands = _get_entry(sensor)['bands']
+    if band not in bands:
+        raise ValueError(
+            'Band \'{}\' is not defined for sensor \'{}\'. Choose from {}.'
+            ''.format(band, sensor, sorted(bands)))
+    return copy.deepcopy(bands[band])
+
+
+if __name__ == '__main__':
+    print(write_metadata_index())
@@ -0,0 +1,153 @@
+"""Process-parallel convolution of large pixel batches
+
+The pixel axis is split across a concurrent.futures process pool.
+Kernel, spectra and output are handed to the workers once, as shared
+memory blocks or memory-mapped files, so tasks only carry pixel ranges.
+"""
+import collections
+import concurrent.futures
+import mmap
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from sensor_response_curves import convolution
+
+# location of an array that worker processes can attach to
+_ArraySpec = collections.namedtuple(
+    '_ArraySpec', ['kind', 'name', 'shape', 'dtype', 'offset'])
+
+# arrays attached in a worker process
+_WORKER_ARRAYS = {}
+
+
+def _share(a, blocks):
+    """Get spec and array for a, copied to shared memory unless memory-mapped
+
+    Only C-contiguous memory maps are passed by file, as workers
+    reopen them in C order.
+    """
+    a = np.asanyarray(a)
+    if (isinstance(a, np.memmap) and isinstance(a.base, mmap.mmap) and a.filename and
+            a.flags.c_contiguous):
+        return _ArraySpec('memmap', a.filename, a.shape, a.dtype.str, a.offset), a
+    shared = _empty_shared(a.shape, a.dtype, blocks)
+    shared[1][...] = a
+    return shared
+
+
+def _empty_shared(shape, dtype, blocks):
+    dtype = np.dtype(dtype)
+    shm = shared_memory.SharedMemory(
+        create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+    blocks.append(shm)
+    spec = _ArraySpec('shm', shm.name, shape, dtype.str, 0)
+    return spec, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _attach(spec, mode='r'):
+    """Get (array, handle) for spec in the current process"""
+    if spec.kind == 'memmap':
+        a = np.memmap(
+            spec.name, dtype=spec.dtype, mode=mode, offset=spec.offset, shape=spec.shape)
+        return a, a
+    shm = shared_memory.SharedMemory(name=spec.name)
+    return np.ndarray(spec.shape, dtype=spec.dtype, buffer=shm.buf), shm
+
+
+def _init_worker(kernel_spec, spectra_spec, out_spec):
+    _WORKER_ARRAYS.clear()
+    for key, spec, mode in [
+            ('kernel', kernel_spec, 'r'),
+            ('spectra', spectra_spec, 'r'),
+            ('out', out_spec, 'r+')]:
+        _WORKER_ARRAYS[key] = _attach(spec, mode)
+
+
+def _convolve_range(start, stop):
+    kernel = _WORKER_ARRAYS['kernel'][0]
+    spectra = _WORKER_ARRAYS['spectra'][0]
+    out = _WORKER_ARRAYS['out'][0]
+    out[start:stop] = convolution._dot_support(spectra[start:stop], kernel)
+    return stop - start
+
+
+def convolve_parallel(
+        sensor, wavelength, spectra, bandkeys=None, out=None,
+        workers=None, chunksize=None):
+    """Get band-equivalent values of spectra using a process pool
+
+    Parameters
+    ----------
+    sensor : str in SUPPORTED_SENSORS
+        sensor name
+    wavelength : ndarray shape(nwavelengths)
+        wavelength grid of the spectra in nm
+    spectra : ndarray shape(npixels, nwavelengths)
+        spectra to convolve
+        C-contiguous memory-mapped arrays are read by the workers
+        directly, others are copied to shared memory once
+    bandkeys : list of str, optional
+        bands to compute
+        default: BAND_SEQUENCE for the sensor group
+    out : numpy.memmap shape(npixels, nbands) of float64, optional
+        memory-mapped output, written by the workers directly if C-contiguous
+        default: new array
+    workers : int, optional
+        number of processes
+        default: os.cpu_count()
+    chunksize : int, optional
+        pixels per task
+        default: split into four tasks per worker
+
+    Returns
+    -------
+    ndarray shape(npixels, nbands)
+        response-weighted band values
+    """
+    spectra = np.asanyarray(spectra)
+    if spectra.ndim != 2 or spectra.shape[1] != len(wavelength):
+        raise ValueError(
+            'spectra must have shape (npixels, {}), got {}.'
+            ''.format(len(wavelength), spectra.shape))
+    kernel = convolution.get_kernel(sensor, wavelength, bandkeys=bandkeys)
+    npixels = spectra.shape[0]
+    shape = (npixels, kernel.shape[0])
+    workers = workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, -(-npixels // (4 * workers)))
+
+    blocks = []
+    result = None
+    try:
+        kernel_spec = _share(kernel, blocks)[0]
+        spectra_spec = _share(spectra, blocks)[0]
+        if out is None:
+            out_spec, result = _empty_shared(shape, 'float64', blocks)
+        elif out.shape != shape or out.dtype != np.float64:
+            raise ValueError(
+                'out must be float64 of shape {}, got {} {}.'
+                ''.format(shape, out.dtype, out.shape))
+        else:
+            out_spec, result = _share(out, blocks)
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker,
+                initargs=(kernel_spec, spectra_spec, out_spec)) as executor:
+            futures = [
+                executor.submit(_convolve_range, start, min(start + chunksize, npixels))
+                for start in range(0, npixels, chunksize)]
+            for future in futures:
+                future.result()
+        if out is None:
+            out = result.copy()
+        else:
+            if out_spec.kind == 'shm':
+                out[...] = result
+            if isinstance(out, np.memmap):
+                out.flush()
+    finally:
+        result = None
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+    return out
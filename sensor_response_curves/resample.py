@@ -1,9 +1,153 @@
+import collections
+
 import numpy as np
-import scipy.interpolate
+
+from sensor_response_curves import support
+from sensor_response_curves._cache import LRUCache, array_hash
+
+# kinds handled by the NumPy linear engine, others go to scipy.interpolate.interp1d
+LINEAR_KINDS = ('linear', 'slinear')
+
+# area-conserving bin average
+REBIN_KIND = 'rebin'
+
+LinearWeights = collections.namedtuple('LinearWeights', ['index', 'weight', 'inside'])
+
+# linear weights keyed by hashes of source and target grid
+_WEIGHTS_CACHE = LRUCache(maxsize=64)
+
+
+def get_linear_weights(wavelength, target_wavelength):
+    """Get cached linear interpolation weights between two grids
+
+    Weights only depend on the grids, so they are shared by all
+    sensors with the same native grid.
+
+    Parameters
+    ----------
+    wavelength : ndarray shape(nvalues)
+        ascending source grid
+    target_wavelength : ndarray shape(ntarget)
+        target grid
+
+    Returns
+    -------
+    LinearWeights : namedtuple of read-only arrays
+        index : left neighbour in wavelength of each target point
+        weight : weight of the right neighbour
+        inside : target points within the wavelength range
+    """
+    key = (array_hash(np.asarray(wavelength, dtype='float')),
+           array_hash(np.asarray(target_wavelength, dtype='float')))
+    return _WEIGHTS_CACHE.get_or_build(
+        key, lambda: _build_linear_weights(wavelength, target_wavelength))
+
+
+def _build_linear_weights(wavelength, target_wavelength):
+    weights = LinearWeights(*_linear_weights(wavelength, target_wavelength))
+    for a in weights:
+        a.flags.writeable = False
+    return weights
+
+
+def _linear_weights(wavelength, xnew):
+    """Get linear interpolation indices and weights from wavelength to xnew"""
+    wavelength = np.asarray(wavelength, dtype='float')
+    xnew = np.asarray(xnew, dtype='float')
+    index = np.searchsorted(wavelength, xnew, side='right') - 1
+    np.clip(index, 0, max(wavelength.size - 2, 0), out=index)
+    left = wavelength[index]
+    right = wavelength[np.minimum(index + 1, wavelength.size - 1)]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weight = np.where(right > left, (xnew - left) / (right - left), 0.0)
+    inside = (xnew >= wavelength[0]) & (xnew <= wavelength[-1])
+    return index, weight, inside
+
+
+def _apply_linear_weights(rcurves, index, weight, inside):
+    """Interpolate all rcurves along last axis with precomputed weights"""
+    rcurves = np.asarray(rcurves, dtype='float')
+    right = np.minimum(index + 1, rcurves.shape[-1] - 1)
+    result = rcurves[..., index] * (1 - weight) + rcurves[..., right] * weight
+    result[..., ~inside] = 0
+    return result
+
+
+def _bin_edges(xnew):
+    """Get edges of bins centred on xnew, halfway between neighbours"""
+    xnew = np.asarray(xnew, dtype='float')
+    if xnew.size < 2:
+        raise ValueError('Rebinning requires at least two target wavelengths.')
+    mid = (xnew[1:] + xnew[:-1]) / 2
+    return np.concatenate([[2 * xnew[0] - mid[0]], mid, [2 * xnew[-1] - mid[-1]]])
+
+
+def _cumulative_integral(wavelength, rcurves, x):
+    """Integral of linearly interpolated rcurves from wavelength[0] to each x"""
+    wavelength = np.asarray(wavelength, dtype='float')
+    areas = np.diff(wavelength) * (rcurves[..., 1:] + rcurves[..., :-1]) / 2
+    cumulative = np.concatenate(
+        [np.zeros(rcurves.shape[:-1] + (1,)), np.cumsum(areas, axis=-1)], axis=-1)
+    index, weight, inside = get_linear_weights(wavelength, x)
+    values = _apply_linear_weights(rcurves, index, weight, inside)
+    result = (
+        cumulative[..., index] +
+        (x - wavelength[index]) * (rcurves[..., index] + values) / 2)
+    result[..., x < wavelength[0]] = 0
+    result[..., x > wavelength[-1]] = cumulative[..., -1:]
+    return result
+
+
+def _rebin(wavelength, rcurves, xnew):
+    """Average response curves over bins centred on xnew, conserving area
+
+    NaN values in rcurves are treated as zero.
+    """
+    rcurves = np.nan_to_num(np.asarray(rcurves, dtype='float'))
+    edges = _bin_edges(xnew)
+    cumulative = _cumulative_integral(wavelength, rcurves, edges)
+    return np.diff(cumulative, axis=-1) / np.diff(edges)
+
+
+def _sort_ascending(wavelength, rcurves):
+    """Sort wavelength and rcurves by wavelength unless already ascending"""
+    wavelength = np.asarray(wavelength, dtype='float')
+    if np.any(np.diff(wavelength) < 0):
+        order = np.argsort(wavelength, kind='stable')
+        return wavelength[order], np.asarray(rcurves)[..., order]
+    return wavelength, rcurves
+
+
+def _interpolate(wavelength, rcurves, xnew, kind='slinear'):
+    """Interpolate response curves to xnew, zero outside wavelength range
+
+    wavelength may be in any order, as with interp1d.
+    """
+    wavelength, rcurves = _sort_ascending(wavelength, rcurves)
+    if kind == REBIN_KIND:
+        return _rebin(wavelength, rcurves, xnew)
+    if kind in LINEAR_KINDS:
+        return _apply_linear_weights(rcurves, *get_linear_weights(wavelength, xnew))
+    import scipy.interpolate
+    f = scipy.interpolate.interp1d(
+            wavelength, rcurves, kind=kind, axis=1,
+            bounds_error=False, fill_value=0)
+    return f(xnew)
+
+
+def _support_range(wavelength, rcurves):
+    """Get wavelength range covered by the support of any band"""
+    wavelength, rcurves = _sort_ascending(wavelength, rcurves)
+    start, stop = support.band_support(np.nan_to_num(rcurves))
+    nonempty = stop > start
+    if not nonempty.any():
+        return wavelength[0], wavelength[0]
+    return wavelength[start[nonempty].min()], wavelength[stop[nonempty].max() - 1]
 
 
 def resample_response_curves(
-        wavelength, rcurves, resolution, kind='slinear'):
+        wavelength, rcurves, resolution=None, kind='slinear',
+        target_wavelength=None, clip_to_support=False):
     """Resample the given response curve to specified spectral resolution
 
     Parameters
@@ -14,9 +158,19 @@ def resample_response_curves(
         sensor response curve
     resolution : float
         resolution to interpolate to
+        ignored if target_wavelength is given
     kind : str
         interpolation algorithm for
         scipy.interpolate.interp1d
+        'linear' and 'slinear' are computed with NumPy only
+        'rebin' averages the curves over bins centred on the new
+        wavelengths, which conserves band integrals at coarse resolution
+    target_wavelength : ndarray shape(ntarget), optional
+        grid to interpolate to, e.g. the band centres of a spectrometer
+        default: from wavelength[0] to wavelength[-1] in steps of resolution
+    clip_to_support : bool
+        drop new wavelengths outside the range where
+        any response curve is non-zero
 
     Returns
     -------
@@ -25,11 +179,16 @@ def resample_response_curves(
     rcurves : ndarray
         resampled rcurves
     """
-    f = scipy.interpolate.interp1d(
-            wavelength, rcurves, kind=kind, axis=1,
-            bounds_error=False, fill_value=0)
-    start_wv = wavelength[0]
-    end_wv = wavelength[-1]
-    nsteps = round((end_wv - start_wv) / resolution) + 1
-    xnew = np.linspace(start_wv, end_wv, nsteps)
-    return xnew, f(xnew)
+    if target_wavelength is not None:
+        xnew = np.asarray(target_wavelength, dtype='float')
+    elif resolution is not None:
+        start_wv = wavelength[0]
+        end_wv = wavelength[-1]
+        nsteps = round((end_wv - start_wv) / resolution) + 1
+        xnew = np.linspace(start_wv, end_wv, nsteps)
+    else:
+        raise ValueError('Either resolution or target_wavelength is required.')
+    if clip_to_support:
+        start_wv, end_wv = _support_range(wavelength, rcurves)
+        xnew = xnew[(xnew >= start_wv) & (xnew <= end_wv)]
+    return xnew, _interpolate(wavelength, rcurves, xnew, kind=kind)
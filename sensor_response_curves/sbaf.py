@@ -0,0 +1,128 @@
+"""Spectral band adjustment factors between sensors
+
+A spectral library is convolved through all sensors at once and, for
+every ordered pair of sensors, the values of each band both sensors
+share (by standard name) are related by a least-squares line
+
+    target = slope * source + intercept
+
+All pairs and bands are fitted together from column statistics.
+"""
+import collections
+import itertools
+
+import numpy as np
+
+import sensor_response_curves as srcurves
+from sensor_response_curves import convolution
+from sensor_response_curves._cache import LRUCache, array_hash
+
+SBAF = collections.namedtuple(
+    'SBAF', ['bandkeys', 'slope', 'intercept', 'rvalue', 'ratio'])
+
+_SBAF_CACHE = LRUCache(maxsize=16)
+
+
+def _band_pairs(sensors, offsets):
+    """Get sensor pairs and column indices of their common bands"""
+    bandkeys = [srcurves._get_defined_default_bands(sensor) for sensor in sensors]
+    pairs = []
+    for i, j in itertools.permutations(range(len(sensors)), 2):
+        common = [key for key in bandkeys[i] if key in bandkeys[j]]
+        pairs.append((
+            (sensors[i], sensors[j]), common,
+            [offsets[i] + bandkeys[i].index(key) for key in common],
+            [offsets[j] + bandkeys[j].index(key) for key in common]))
+    return pairs
+
+
+def fit_band_pairs(x, y):
+    """Fit y = slope * x + intercept for each column pair
+
+    Parameters
+    ----------
+    x, y : ndarray shape(nsamples, npairs)
+        source and target values
+
+    Returns
+    -------
+    slope, intercept, rvalue, ratio : ndarray shape(npairs)
+        linear fit, correlation coefficient and ratio of means
+    """
+    xmean = x.mean(axis=0)
+    ymean = y.mean(axis=0)
+    dx = x - xmean
+    dy = y - ymean
+    sxx = np.einsum('ij,ij->j', dx, dx)
+    syy = np.einsum('ij,ij->j', dy, dy)
+    sxy = np.einsum('ij,ij->j', dx, dy)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = sxy / sxx
+        rvalue = sxy / np.sqrt(sxx * syy)
+        ratio = ymean / xmean
+    return slope, ymean - slope * xmean, rvalue, ratio
+
+
+def get_sbaf(sensors, wavelength, library):
+    """Get band adjustment factors between all pairs of sensors
+
+    Results are cached by sensors, wavelength grid and library contents.
+
+    Parameters
+    ----------
+    sensors : list of str
+        sensor names
+    wavelength : ndarray shape(nwavelengths)
+        wavelength grid of the library in nm
+    library : ndarray shape(nspectra, nwavelengths)
+        spectral library
+
+    Returns
+    -------
+    dict
+        SBAF namedtuple per (source, target) sensor pair, holding
+        bandkeys : tuple of str
+            standard names of the bands both sensors have
+        slope, intercept : ndarray shape(nbands)
+            target = slope * source + intercept
+        rvalue : ndarray shape(nbands)
+            correlation coefficient
+        ratio : ndarray shape(nbands)
+            ratio of target and source library means
+        NaN for bands outside the library wavelength range
+    """
+    sensors = tuple(sensors)
+    for sensor in sensors:
+        srcurves._check_supported_sensor(sensor)
+    wavelength = np.asarray(wavelength, dtype='float')
+    library = np.asarray(library, dtype='float')
+    if library.ndim != 2 or library.shape[1] != wavelength.size:
+        raise ValueError(
+            'library must have shape (nspectra, {}), got {}.'
+            ''.format(wavelength.size, library.shape))
+    key = (sensors, array_hash(wavelength), array_hash(library))
+    stamp = srcurves._stamp(sensors)
+    return _SBAF_CACHE.get_or_build(
+        key, lambda: _build_sbaf(sensors, wavelength, library), stamp=stamp)
+
+
+def _build_sbaf(sensors, wavelength, library):
+    kernel, offsets = convolution.get_stacked_kernel(sensors, wavelength)
+    values = convolution._dot_support(library, kernel)
+    pairs = _band_pairs(sensors, offsets)
+    source = np.array([i for pair in pairs for i in pair[2]], dtype='intp')
+    target = np.array([j for pair in pairs for j in pair[3]], dtype='intp')
+    fits = fit_band_pairs(values[:, source], values[:, target])
+    table = {}
+    start = 0
+    for pair, common, _, _ in pairs:
+        stop = start + len(common)
+        table[pair] = SBAF(tuple(common), *(
+            srcurves._make_readonly(a[start:stop].copy()) for a in fits))
+        start = stop
+    return table
+
+
+def clear_sbaf_cache():
+    """Remove all band adjustment factors from the cache"""
+    _SBAF_CACHE.clear()
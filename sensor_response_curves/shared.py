@@ -0,0 +1,291 @@
+"""Response curves in shared memory for multi-process servers
+
+A parent process publishes the parsed curves of all sensors once into a
+single multiprocessing.shared_memory block::
+
+    store = shared.publish()
+    # start workers, passing store.name
+
+Workers attach to the block by name and serve get_data_raw,
+get_data_standard_names and get_response_curves from it without copies::
+
+    shared.attach(name)
+
+Forked workers inherit the attached store and never unlink it.
+The block starts with a JSON manifest giving the offset and shape of
+each array behind it.
+"""
+import json
+import os
+import struct
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import sensor_response_curves as srcurves
+
+# manifest length and offset of the first array
+_HEADER = struct.Struct('<QQ')
+_ALIGN = 64
+
+_LOCK = threading.Lock()
+
+
+def _align(offset):
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def _open_block(name, owner=False):
+    """Open existing block without letting this process's tracker unlink it
+
+    The owner keeps the registration made when the block was created.
+    """
+    if owner:
+        return shared_memory.SharedMemory(name=name)
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: opening registers the block with this process's
+        # resource tracker, which would unlink it when this process exits
+        from multiprocessing import resource_tracker
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class SharedCurveStore(object):
+    """Parsed response curves in a shared memory block
+
+    Use publish or attach to get one.
+    """
+
+    def __init__(self, shm, owner=False):
+        self._shm = shm
+        self.owner = owner
+        size, self._start = _HEADER.unpack_from(shm.buf, 0)
+        self.manifest = json.loads(
+            bytes(shm.buf[_HEADER.size:_HEADER.size + size]).decode('utf-8'))
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    @property
+    def sensors(self):
+        return sorted(self.manifest['sensors'])
+
+    def __contains__(self, sensor):
+        return sensor in self.manifest['sensors']
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        _release(self)
+
+    @property
+    def closed(self):
+        return self._shm.buf is None
+
+    def is_current(self, sensor, mtime):
+        """Check whether store holds data for sensor parsed from file with mtime"""
+        if self.closed:
+            return False
+        entry = self.manifest['sensors'].get(sensor)
+        return entry is not None and entry['mtime'] == mtime
+
+    def _array(self, spec, dtype='float'):
+        if self.closed:
+            raise ValueError('Shared curve store \'{}\' is closed.'.format(self.name))
+        a = np.ndarray(
+            tuple(spec['shape']), dtype=dtype, buffer=self._shm.buf,
+            offset=self._start + spec['offset'])
+        a.flags.writeable = False
+        return a
+
+    def get_data_raw(self, sensor):
+        """Get structured array as from get_data_raw"""
+        entry = self.manifest['sensors'][sensor]
+        values = self._array(entry['raw'])
+        dtype = np.dtype([(name, values.dtype) for name in entry['names']])
+        return values.view(dtype)[:, 0]
+
+    def get_curve_table(self, sensor):
+        """Get columnar curves as used by get_response_curves"""
+        entry = self.manifest['sensors'][sensor]
+        bandkeys = tuple(entry['bandkeys'])
+        return srcurves._CurveTable(
+            wavelength=self._array(entry['wavelength']),
+            curves=self._array(entry['curves']),
+            bandkeys=bandkeys,
+            band_index={name: i for i, name in enumerate(bandkeys)})
+
+    def close(self):
+        """Close this process's mapping of the block
+
+        Curves are no longer served from the store afterwards.
+        Arrays obtained from it must not be used any more.
+        """
+        _uninstall(self)
+        self._shm.close()
+
+    def unlink(self):
+        """Destroy the block once all processes have closed it"""
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        self.owner = False
+
+
+def _sensor_arrays(sensor):
+    raw = srcurves._build_data_raw(sensor)
+    table = srcurves._build_curve_table(sensor)
+    values = raw.view('float').reshape(raw.shape[0], -1)
+    return raw.dtype.names, values, table
+
+
+def publish(sensors=None):
+    """Publish parsed curves of sensors in a new shared memory block
+
+    The store is also attached in this process.
+
+    Parameters
+    ----------
+    sensors : list of str, optional
+        sensors to publish
+        default: SUPPORTED_SENSORS
+
+    Returns
+    -------
+    SharedCurveStore
+        owning store; call unlink() when all workers are done
+    """
+    sensors = sensors or srcurves.SUPPORTED_SENSORS
+    manifest = {'sensors': {}}
+    arrays = []
+    offset = 0
+    for sensor in sensors:
+        mtime = os.path.getmtime(srcurves._get_csv_file(sensor))
+        names, values, table = _sensor_arrays(sensor)
+        entry = {'mtime': mtime, 'names': list(names), 'bandkeys': list(table.bandkeys)}
+        for key, a in [('raw', values), ('wavelength', table.wavelength), ('curves', table.curves)]:
+            entry[key] = {'offset': offset, 'shape': list(a.shape)}
+            arrays.append((offset, a))
+            offset = _align(offset + a.nbytes)
+        manifest['sensors'][sensor] = entry
+
+    header = json.dumps(manifest).encode('utf-8')
+    start = _align(_HEADER.size + len(header))
+    shm = shared_memory.SharedMemory(create=True, size=start + max(offset, 1))
+    _HEADER.pack_into(shm.buf, 0, len(header), start)
+    shm.buf[_HEADER.size:_HEADER.size + len(header)] = header
+    for offset, a in arrays:
+        np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf, offset=start + offset)[...] = a
+    store = SharedCurveStore(shm, owner=True)
+    _install(store)
+    return store
+
+
+def attach(name):
+    """Attach to a published store and serve curves from it
+
+    Parameters
+    ----------
+    name : str
+        SharedCurveStore.name of the published store
+
+    Returns
+    -------
+    SharedCurveStore
+    """
+    store = SharedCurveStore(_open_block(name))
+    _install(store)
+    return store
+
+
+def reattach(name=None):
+    """Map a store block anew, dropping all arrays served from the current one
+
+    Parameters
+    ----------
+    name : str, optional
+        SharedCurveStore.name of the store to attach to,
+        e.g. one newly published by the parent process
+        default: block of the current store
+
+    Returns
+    -------
+    SharedCurveStore or None
+        None if no name is given and no store is attached
+    """
+    store = srcurves._SHARED_STORE
+    if name is None:
+        if store is None:
+            return None
+        name = store.name
+    owner = store is not None and store.owner and store.name == name
+    if owner:
+        # keep the block alive while it is reopened
+        store.owner = False
+    new_store = SharedCurveStore(_open_block(name, owner=owner), owner=owner)
+    _install(new_store)
+    return new_store
+
+
+def get_store():
+    """Get the store attached in this process, if any"""
+    return srcurves._SHARED_STORE
+
+
+def detach():
+    """Stop serving curves from the attached store and close it
+
+    An owning store is unlinked as well.
+    """
+    store = srcurves._SHARED_STORE
+    if store is not None:
+        _release(store)
+
+
+def _uninstall(store):
+    """Stop serving curves from store if it is the attached one"""
+    with _LOCK:
+        if srcurves._SHARED_STORE is store:
+            srcurves._SHARED_STORE = None
+            srcurves.clear_cache()
+
+
+def _release(store):
+    """Uninstall and close store and unlink it if owned"""
+    _uninstall(store)
+    try:
+        store.close()
+    except BufferError:
+        # arrays from the store are still referenced elsewhere;
+        # the mapping is released once they are gone
+        pass
+    if store.owner:
+        store.unlink()
+
+
+def _install(store):
+    """Serve curves from store, releasing the previous one"""
+    with _LOCK:
+        previous = srcurves._SHARED_STORE
+        srcurves._SHARED_STORE = store
+        srcurves.clear_cache()
+    if previous is not None and previous is not store:
+        _release(previous)
+
+
+def _after_fork_in_child():
+    store = srcurves._SHARED_STORE
+    if store is not None:
+        # only the publishing process may destroy the block
+        store.owner = False
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,56 @@
+"""Band-averaged solar irradiance (ESUN)
+
+ESUN of a band is the solar spectrum convolved with the band response,
+computed for all bands of all sensors with one product against the
+stacked convolution kernel. The solar spectrum is supplied by the caller
+on any wavelength grid.
+"""
+import numpy as np
+
+import sensor_response_curves as srcurves
+from sensor_response_curves import convolution
+from sensor_response_curves._cache import LRUCache, array_hash
+
+_ESUN_CACHE = LRUCache(maxsize=64)
+
+
+def get_esun(sensors, wavelength, irradiance):
+    """Get in-band solar irradiance of the default bands of sensors
+
+    Results are cached by sensors and solar spectrum.
+
+    Parameters
+    ----------
+    sensors : str or list of str
+        sensor name(s)
+    wavelength : ndarray shape(nwavelengths)
+        wavelength grid of the solar spectrum in nm
+    irradiance : ndarray shape(nwavelengths)
+        solar spectral irradiance, e.g. in W m-2 nm-1
+
+    Returns
+    -------
+    dict of ndarray shape(nbands)
+        read-only ESUN per sensor, in the units of irradiance
+        NaN for bands outside the wavelength grid
+    """
+    if isinstance(sensors, str):
+        sensors = [sensors]
+    sensors = tuple(sensors)
+    for sensor in sensors:
+        srcurves._check_supported_sensor(sensor)
+    wavelength = np.asarray(wavelength, dtype='float')
+    irradiance = np.asarray(irradiance, dtype='float')
+    if irradiance.shape != wavelength.shape:
+        raise ValueError(
+            'irradiance must have shape {}, got {}.'
+            ''.format(wavelength.shape, irradiance.shape))
+    key = (sensors, array_hash(wavelength), array_hash(irradiance))
+    stamp = srcurves._stamp(sensors)
+    return _ESUN_CACHE.get_or_build(
+        key, lambda: _build_esun(sensors, wavelength, irradiance), stamp=stamp)
+
+
+def _build_esun(sensors, wavelength, irradiance):
+    values = convolution.convolve_sensors(sensors, wavelength, irradiance)
+    return {sensor: srcurves._make_readonly(v) for sensor, v in values.items()}
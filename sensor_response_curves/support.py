@@ -0,0 +1,118 @@
+"""Spectral support of response curves
+
+Most response curves are zero over the bulk of the wavelength range
+of their file. The support of a band is the index window
+[start, stop) outside of which its response is negligible.
+"""
+import collections
+
+import numpy as np
+
+import sensor_response_curves as srcurves
+
+CompactCurve = collections.namedtuple('CompactCurve', ['offset', 'values'])
+
+
+def band_support(rcurves, threshold=0.0):
+    """Get support window for each band
+
+    Parameters
+    ----------
+    rcurves : ndarray shape(nbands, nvals)
+        response curves
+    threshold : float
+        response at or below threshold times the band maximum
+        is negligible
+
+    Returns
+    -------
+    start, stop : ndarray shape(nbands,) of int
+        first and one past last index of non-negligible response
+        (0, 0) for bands without any
+    """
+    rcurves = np.atleast_2d(rcurves)
+    peak = np.nanmax(rcurves, axis=1, keepdims=True)
+    with np.errstate(invalid='ignore'):
+        return mask_support(rcurves > threshold * peak)
+
+
+def mask_support(mask):
+    """Get window [start, stop) enclosing the True values in each row of mask"""
+    nonempty = mask.any(axis=1)
+    start = np.where(nonempty, mask.argmax(axis=1), 0)
+    stop = np.where(nonempty, mask.shape[1] - mask[:, ::-1].argmax(axis=1), 0)
+    return start, stop
+
+
+def get_band_support(sensor, pan_only=False, bandkeys=None, band_ids=None, threshold=0.0):
+    """Get support window for the response curves of a sensor
+
+    Parameters
+    ----------
+    sensor : str in SUPPORTED_SENSORS
+        sensor name
+    pan_only, bandkeys, band_ids
+        band selection, see get_response_curves
+    threshold : float
+        response at or below threshold times the band maximum
+        is negligible
+
+    Returns
+    -------
+    start, stop : ndarray shape(nbands,) of int
+        first and one past last index of non-negligible response
+        in the wavelength array from get_response_curves
+    """
+    start, stop = srcurves._cached(
+        sensor, ('support', threshold),
+        lambda sensor: _build_support(sensor, threshold))
+    index = srcurves._get_band_index(sensor, pan_only, bandkeys, band_ids)
+    return start[index], stop[index]
+
+
+def _build_support(sensor, threshold):
+    start, stop = band_support(srcurves._get_curve_table(sensor).curves, threshold)
+    return srcurves._make_readonly(start), srcurves._make_readonly(stop)
+
+
+def compact_response_curves(rcurves, threshold=0.0):
+    """Trim response curves to their support
+
+    Parameters
+    ----------
+    rcurves : ndarray shape(nbands, nvals)
+        response curves
+    threshold : float
+        see band_support
+
+    Returns
+    -------
+    list of CompactCurve
+        offset into the wavelength array and view
+        on the values within the support of each band
+    """
+    start, stop = band_support(rcurves, threshold)
+    return [
+        CompactCurve(offset=i0, values=rcurve[i0:i1])
+        for rcurve, i0, i1 in zip(np.atleast_2d(rcurves), start, stop)]
+
+
+def expand_response_curves(compact, nvals):
+    """Get dense response curves from compact representation
+
+    Parameters
+    ----------
+    compact : list of CompactCurve
+        compact response curves
+    nvals : int
+        length of the wavelength array
+
+    Returns
+    -------
+    rcurves : ndarray shape(nbands, nvals)
+        response curves, zero outside the support
+    """
+    rcurves = np.zeros((len(compact), nvals))
+    for rcurve, (offset, values) in zip(rcurves, compact):
+        rcurve[offset:offset + len(values)] = values
+    return rcurves
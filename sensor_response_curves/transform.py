@@ -0,0 +1,145 @@
+"""Linear transforms between the band spaces of two sensors
+
+A transform maps band values of a source sensor to those of a target
+sensor,
+
+    target = source.dot(matrix.T) + offset
+
+with matrix and offset fitted by least squares over a spectral library
+convolved through both sensors. Transforms are saved as .npz files and
+applied to band-last arrays of any size block by block, so whole scenes
+(e.g. memory-mapped) can be converted without going through spectra.
+"""
+import collections
+
+import numpy as np
+
+import sensor_response_curves as srcurves
+from sensor_response_curves import convolution
+
+DEFAULT_MAX_BYTES = 256 * 2 ** 20
+
+BandTransform = collections.namedtuple(
+    'BandTransform', [
+        'source', 'target', 'source_bandkeys', 'target_bandkeys', 'matrix', 'offset'])
+
+
+def fit_transform(source, target, wavelength, library, intercept=True):
+    """Fit least-squares transform from source to target band values
+
+    Parameters
+    ----------
+    source, target : str in SUPPORTED_SENSORS
+        sensor names
+    wavelength : ndarray shape(nwavelengths)
+        wavelength grid of the library in nm
+    library : ndarray shape(nspectra, nwavelengths)
+        spectral library
+    intercept : bool
+        fit offset, otherwise it is zero
+
+    Returns
+    -------
+    BandTransform : namedtuple
+        source, target : str
+        source_bandkeys, target_bandkeys : tuple of str
+            default bands of the sensors
+        matrix : ndarray shape(ntarget, nsource)
+        offset : ndarray shape(ntarget)
+    """
+    library = np.asarray(library, dtype='float')
+    if library.ndim != 2 or library.shape[1] != len(wavelength):
+        raise ValueError(
+            'library must have shape (nspectra, {}), got {}.'
+            ''.format(len(wavelength), library.shape))
+    values = convolution.convolve_sensors([source, target], wavelength, library)
+    x = values[source]
+    y = values[target]
+    for sensor, v in [(source, x), (target, y)]:
+        missing = np.isnan(v).any(axis=0)
+        if missing.any():
+            bandkeys = srcurves._get_defined_default_bands(sensor)
+            raise ValueError(
+                'Bands {} of sensor \'{}\' are outside the library wavelength range.'
+                ''.format([bandkeys[i] for i in np.flatnonzero(missing)], sensor))
+    if intercept:
+        x = np.hstack([x, np.ones((len(x), 1))])
+    coef = np.linalg.lstsq(x, y, rcond=None)[0].T
+    if intercept:
+        matrix, offset = coef[:, :-1], coef[:, -1]
+    else:
+        matrix, offset = coef, np.zeros(len(coef))
+    return BandTransform(
+        source=source, target=target,
+        source_bandkeys=tuple(srcurves._get_defined_default_bands(source)),
+        target_bandkeys=tuple(srcurves._get_defined_default_bands(target)),
+        matrix=np.ascontiguousarray(matrix), offset=offset)
+
+
+def save_transform(transform, path):
+    """Save transform to .npz file"""
+    np.savez(
+        path,
+        sensors=np.array([transform.source, transform.target]),
+        source_bandkeys=np.array(transform.source_bandkeys, dtype='U'),
+        target_bandkeys=np.array(transform.target_bandkeys, dtype='U'),
+        matrix=transform.matrix,
+        offset=transform.offset)
+
+
+def load_transform(path):
+    """Load transform saved with save_transform"""
+    with np.load(path, allow_pickle=False) as data:
+        source, target = (str(s) for s in data['sensors'])
+        return BandTransform(
+            source=source, target=target,
+            source_bandkeys=tuple(str(s) for s in data['source_bandkeys']),
+            target_bandkeys=tuple(str(s) for s in data['target_bandkeys']),
+            matrix=data['matrix'], offset=data['offset'])
+
+
+def apply_transform(transform, values, out=None, max_bytes=DEFAULT_MAX_BYTES):
+    """Convert source band values to target band values block by block
+
+    Parameters
+    ----------
+    transform : BandTransform
+        transform from fit_transform or load_transform
+    values : ndarray shape(..., nsource)
+        band-last source values, e.g. memory-mapped
+        read block by block if C-contiguous
+    out : ndarray shape(..., ntarget), optional
+        C-contiguous array to write to, e.g. memory-mapped
+        default: new float64 array
+    max_bytes : int
+        memory budget per block
+
+    Returns
+    -------
+    ndarray shape(..., ntarget)
+        target band values
+    """
+    ntarget, nsource = transform.matrix.shape
+    if values.shape[-1] != nsource:
+        raise ValueError(
+            'Last axis of values must have {} bands, got {}.'
+            ''.format(nsource, values.shape[-1]))
+    shape = values.shape[:-1] + (ntarget,)
+    if out is None:
+        out = np.empty(shape)
+    elif out.shape != shape or not out.flags.c_contiguous:
+        raise ValueError(
+            'out must be C-contiguous of shape {}, got {}.'.format(shape, out.shape))
+    flat_values = values.reshape(-1, nsource)
+    flat_out = out.reshape(-1, ntarget)
+    bytes_per_row = nsource * (values.dtype.itemsize + 8) + ntarget * 8
+    step = max(1, int(max_bytes // bytes_per_row))
+    matrix_t = transform.matrix.T
+    for start in range(0, len(flat_values), step):
+        block = np.asarray(flat_values[start:start + step], dtype='float')
+        result = np.dot(block, matrix_t)
+        result += transform.offset
+        flat_out[start:start + step] = result
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
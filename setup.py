@@ -10,4 +10,5 @@ setup(
     author_email='josl@dhigroup.com',
     packages=find_packages(),
     include_package_data=True,
+    python_requires='>=3.8',
     install_requires=['scipy', 'numpy'])
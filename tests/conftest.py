@@ -6,3 +6,13 @@ from sensor_response_curves import SUPPORTED_SENSORS
 @pytest.fixture(params=SUPPORTED_SENSORS)
 def sensor(request):
     return request.param
+
+
+@pytest.fixture(autouse=True, scope='session')
+def bundle_dir(tmp_path_factory):
+    import os
+    from sensor_response_curves import bundle
+    bundle_dir = str(tmp_path_factory.mktemp('bundle'))
+    os.environ[bundle.BUNDLE_DIR_ENV] = bundle_dir
+    yield bundle_dir
+    del os.environ[bundle.BUNDLE_DIR_ENV]
@@ -0,0 +1,26 @@
+import numpy as np
+
+import sensor_response_curves as srcurves
+import sensor_response_curves.bulk as srbulk
+
+
+def test_get_all_response_curves():
+    curves = srbulk.get_all_response_curves()
+    nsensors = len(srcurves.SUPPORTED_SENSORS)
+    assert curves.rcurves.shape[:2] == curves.mask.shape == curves.bandkeys.shape
+    assert curves.rcurves.shape[0] == nsensors
+    assert curves.wavelength[0] == 300
+    assert curves.wavelength[-1] == 2600
+    assert not np.any(curves.rcurves[~curves.mask])
+    assert srbulk.get_all_response_curves() is curves
+
+
+def test_bulk_matches_single_sensor():
+    curves = srbulk.get_all_response_curves(['L8', 'WV3'], resolution=5)
+    wavelength, rcurves = srcurves.get_response_curves('WV3')
+    i = curves.sensors.index('WV3')
+    assert list(curves.bandkeys[i][curves.mask[i]]) == srcurves._get_default_bands('WV3')
+    assert curves.mask[i].sum() == len(rcurves)
+    expected = np.interp(curves.wavelength, wavelength, rcurves[3], left=0, right=0)
+    np.testing.assert_allclose(curves.rcurves[i, 3], expected)
+    assert curves.mask[curves.sensors.index('L8')].sum() == 6
@@ -0,0 +1,77 @@
+import os
+import shutil
+
+import numpy as np
+
+import sensor_response_curves as srcurves
+from sensor_response_curves import bundle
+
+
+def test_build_bundle(tmpdir):
+    bundle_dir = bundle.build_bundle(bundle_dir=str(tmpdir))
+    for sensor in srcurves.SUPPORTED_SENSORS:
+        assert os.path.isfile(os.path.join(bundle_dir, sensor + '.npy'))
+    assert os.path.isfile(os.path.join(bundle_dir, bundle.INDEX_NAME))
+
+
+def test_load_array_matches_csv(sensor, tmpdir):
+    csvfile = srcurves._get_csv_file(sensor)
+    data = bundle.load_array(sensor, csvfile, srcurves._parse_csv, bundle_dir=str(tmpdir))
+    expected = srcurves._parse_csv(csvfile)
+    assert isinstance(data, np.memmap)
+    assert data.dtype.names == expected.dtype.names
+    for name in expected.dtype.names:
+        np.testing.assert_array_equal(data[name], expected[name])
+
+
+def test_load_array_rebuilds_on_hash_change(tmpdir):
+    csvfile = str(tmpdir.join('L8.txt'))
+    shutil.copy(srcurves._get_csv_file('L8'), csvfile)
+    bundle_dir = str(tmpdir.mkdir('bundle'))
+    data = bundle.load_array('L8', csvfile, srcurves._parse_csv, bundle_dir=bundle_dir)
+    assert data['Wavelength'][0] == 427
+    with open(csvfile) as f:
+        lines = f.readlines()
+    lines[1] = lines[1].replace('427', '426', 1)
+    with open(csvfile, 'w') as f:
+        f.writelines(lines)
+    data = bundle.load_array('L8', csvfile, srcurves._parse_csv, bundle_dir=bundle_dir)
+    assert data['Wavelength'][0] == 426
+
+
+def test_bundle_disabled(monkeypatch):
+    monkeypatch.setenv(bundle.BUNDLE_DIR_ENV, '')
+    assert bundle.get_bundle_dir() is None
+    srcurves.clear_cache()
+    data = srcurves.get_data_raw('L8')
+    assert not isinstance(data, np.memmap)
+    srcurves.clear_cache()
+
+
+def _counting_parse(calls):
+    def parse(csvfile):
+        calls.append(csvfile)
+        return srcurves._parse_csv(csvfile)
+    return parse
+
+
+def test_load_array_unwritable_bundle(monkeypatch, tmpdir):
+    def fail(path, write):
+        raise OSError('read-only file system')
+
+    monkeypatch.setattr(bundle, '_atomic_write', fail)
+    calls = []
+    csvfile = srcurves._get_csv_file('L8')
+    data = bundle.load_array('L8', csvfile, _counting_parse(calls), bundle_dir=str(tmpdir))
+    assert len(calls) == 1
+    assert data['Wavelength'][0] == 427
+
+
+def test_load_array_unreadable_bundle(monkeypatch, tmpdir):
+    monkeypatch.setattr(bundle, '_load_npy', lambda npyfile: None)
+    calls = []
+    csvfile = srcurves._get_csv_file('L8')
+    data = bundle.load_array('L8', csvfile, _counting_parse(calls), bundle_dir=str(tmpdir))
+    assert len(calls) == 1
+    assert data is not None
+    assert data['Wavelength'][0] == 427
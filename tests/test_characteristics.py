@@ -0,0 +1,33 @@
+import numpy as np
+
+import sensor_response_curves as srcurves
+from sensor_response_curves import characteristics
+
+
+def test_band_characteristics_triangle():
+    wavelength = np.arange(0, 101, 1.)
+    rcurves = np.maximum(0, 1 - np.abs(wavelength - 50) / 20)[None]
+    chars = characteristics.band_characteristics(wavelength, rcurves)
+    np.testing.assert_allclose(chars.peak, 50)
+    np.testing.assert_allclose(chars.centre, 50)
+    np.testing.assert_allclose(chars.centroid, 50)
+    np.testing.assert_allclose(chars.fwhm, 20)
+    np.testing.assert_allclose(chars.equivalent_width, 20)
+    np.testing.assert_allclose(chars.cut_on_1, 30.2)
+    np.testing.assert_allclose(chars.cut_off_1, 69.8)
+
+
+def test_get_band_characteristics(sensor):
+    wavelength, rcurves = srcurves.get_response_curves(sensor)
+    chars = characteristics.get_band_characteristics(sensor)
+    assert len(chars.bandkeys) == len(rcurves)
+    assert np.all(chars.cut_on_1 <= chars.cut_on_50)
+    assert np.all(chars.cut_on_50 <= chars.peak)
+    assert np.all(chars.peak <= chars.cut_off_50)
+    assert np.all(chars.cut_off_50 <= chars.cut_off_1)
+    for i in range(len(rcurves)):
+        single = characteristics.band_characteristics(wavelength, rcurves[i])
+        np.testing.assert_allclose(single.fwhm[0], chars.fwhm[i])
+    selected = characteristics.get_band_characteristics(sensor, bandkeys=['red'])
+    assert selected.bandkeys == ('red',)
+    assert selected.centre[0] == chars.centre[chars.bandkeys.index('red')]
@@ -0,0 +1,161 @@
+import numpy as np
+import pytest
+
+import sensor_response_curves as srcurves
+import sensor_response_curves.convolution as srconv
+
+trapz = getattr(np, 'trapezoid', getattr(np, 'trapz', None))
+
+
+def test_trapezoid_weights():
+    wavelength = np.array([400, 401, 403, 410.])
+    y = np.array([1, 2, 3, 4.])
+    assert np.isclose(np.sum(srconv.trapezoid_weights(wavelength) * y), trapz(y, wavelength))
+
+
+def test_convolve(sensor):
+    wavelength = np.arange(350, 1100, 2.5)
+    spectra = np.random.RandomState(0).rand(5, wavelength.size)
+    bandkeys = ['blue', 'green', 'red']
+    values = srconv.convolve(sensor, wavelength, spectra, bandkeys=bandkeys)
+    assert values.shape == (5, 3)
+    srf_wavelength, rcurves = srcurves.get_response_curves(sensor, bandkeys=bandkeys)
+    for j, rcurve in enumerate(rcurves):
+        rcurve = np.interp(wavelength, srf_wavelength, np.nan_to_num(rcurve), left=0, right=0)
+        for i, spectrum in enumerate(spectra):
+            expected = trapz(rcurve * spectrum, wavelength) / trapz(rcurve, wavelength)
+            assert np.isclose(values[i, j], expected)
+
+
+def test_convolve_constant_spectrum():
+    wavelength = np.arange(300, 2601, 1.)
+    values = srconv.convolve('S2A', wavelength, np.full(wavelength.size, 0.3))
+    assert values.shape == (13,)
+    np.testing.assert_allclose(values, 0.3)
+
+
+def test_convolve_shape_mismatch():
+    with pytest.raises(ValueError):
+        srconv.convolve('S2A', np.arange(400, 500), np.zeros((2, 10)))
+
+
+def test_kernel_cache():
+    srconv.clear_kernel_cache()
+    wavelength = np.arange(400, 1000, 5.)
+    kernel = srconv.get_kernel('S2A', wavelength)
+    assert srconv.get_kernel('S2A', wavelength.copy()) is kernel
+    assert srconv.get_kernel('S2A', wavelength, bandkeys=['red']) is not kernel
+    assert srconv.get_kernel('S2A', wavelength + 1) is not kernel
+    info = srconv.kernel_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 3, 3)
+    assert info.nbytes == 2 * kernel.nbytes + kernel[:1].nbytes
+    srconv.clear_kernel_cache()
+
+
+def test_kernel_cache_budget():
+    srconv.clear_kernel_cache()
+    wavelength = np.arange(400, 1000, 5.)
+    kernel = srconv.get_kernel('S2A', wavelength)
+    srconv.set_kernel_cache_limits(maxbytes=int(1.5 * kernel.nbytes))
+    try:
+        srconv.get_kernel('S2B', wavelength)
+        assert srconv.kernel_cache_info().currsize == 1
+        srconv.get_kernel('S2B', wavelength)
+        assert srconv.kernel_cache_info().hits == 1
+    finally:
+        srconv.set_kernel_cache_limits()
+        srconv.clear_kernel_cache()
+
+
+def test_sparse_kernel():
+    wavelength = np.arange(300, 2601, 1.)
+    kernel = srconv.get_kernel('S2A', wavelength)
+    sparse = srconv.get_kernel('S2A', wavelength, sparse=True)
+    assert srconv.kernel_density(sparse) < srconv.SPARSE_DENSITY_THRESHOLD
+    np.testing.assert_array_equal(sparse.toarray(), kernel)
+
+
+def test_convolve_sparse(sensor):
+    wavelength = np.arange(300, 2601, 1.)
+    spectra = np.random.RandomState(0).rand(20, wavelength.size)
+    expected = srconv.convolve(sensor, wavelength, spectra, sparse=False)
+    np.testing.assert_allclose(
+        srconv.convolve(sensor, wavelength, spectra, sparse=True), expected)
+    np.testing.assert_allclose(
+        srconv.convolve(sensor, wavelength, np.asfortranarray(spectra)), expected)
+    np.testing.assert_allclose(
+        srconv.convolve(sensor, wavelength, spectra[0], sparse=True), expected[0])
+
+
+def test_convolve_sensors():
+    wavelength = np.arange(400, 2500, 5.)
+    spectra = np.random.RandomState(0).rand(4, wavelength.size)
+    sensors = ['S2A', 'L8', 'WV2']
+    values = srconv.convolve_sensors(sensors, wavelength, spectra)
+    assert list(values) == sensors
+    for sensor in sensors:
+        np.testing.assert_allclose(
+            values[sensor], srconv.convolve(sensor, wavelength, spectra))
+    kernel, offsets = srconv.get_stacked_kernel(sensors, wavelength)
+    assert srconv.get_stacked_kernel(sensors, wavelength.copy())[0] is kernel
+    assert offsets[-1] == len(kernel)
+
+
+def test_convolve_mixed():
+    wavelength = np.arange(400, 2500, 5.)
+    spectra = np.random.RandomState(0).rand(4, 6, wavelength.size)
+    sensors = ['S2A', 'S2B', 'L8']
+    sensor_index = np.random.RandomState(1).randint(-1, 3, size=(4, 6))
+    values, bandkeys = srconv.convolve_mixed(sensors, wavelength, spectra, sensor_index)
+    assert values.shape == (4, 6, len(bandkeys))
+    assert bandkeys[:13] == srcurves._get_default_bands('S2A')
+    assert np.all(np.isnan(values[sensor_index == -1]))
+    for i, sensor in enumerate(sensors):
+        mask = sensor_index == i
+        present = [key for key in bandkeys if key in srcurves._get_default_bands(sensor)]
+        columns = [bandkeys.index(key) for key in present]
+        expected = srconv.convolve(sensor, wavelength, spectra[mask], bandkeys=present)
+        np.testing.assert_allclose(values[mask][:, columns], expected)
+        others = [j for j in range(len(bandkeys)) if j not in columns]
+        assert np.all(np.isnan(values[mask][:, others]))
+
+
+def test_convolve_mixed_shape_mismatch():
+    wavelength = np.arange(400, 1000, 5.)
+    with pytest.raises(ValueError):
+        srconv.convolve_mixed(
+            ['S2A'], wavelength, np.zeros((3, wavelength.size)), np.zeros(4, dtype=int))
+
+
+def test_convolve_mixed_float_index():
+    wavelength = np.arange(400, 1000, 5.)
+    spectra = np.random.RandomState(0).rand(5, wavelength.size)
+    sensor_index = np.array([0, 1, np.nan, 1, 0])
+    values, bandkeys = srconv.convolve_mixed(
+        ['S2A', 'L8'], wavelength, spectra, sensor_index, bandkeys=['red'])
+    expected, _ = srconv.convolve_mixed(
+        ['S2A', 'L8'], wavelength, spectra, np.array([0, 1, -1, 1, 0]), bandkeys=['red'])
+    np.testing.assert_array_equal(values, expected)
+    assert np.isnan(values[2, 0])
+    with pytest.raises(ValueError):
+        srconv.convolve_mixed(
+            ['S2A', 'L8'], wavelength, spectra, sensor_index + 0.5, bandkeys=['red'])
+
+
+def test_convolve_nan_outside_support():
+    wavelength = np.arange(400, 2400, 2.)
+    spectra = np.random.RandomState(0).rand(6, wavelength.size)
+    # water absorption bad bands, between the S2 bands
+    spectra[:, (wavelength >= 1350) & (wavelength <= 1360)] = np.nan
+    dense = srconv.convolve('S2A', wavelength, spectra)
+    fortran = srconv.convolve('S2A', wavelength, np.asfortranarray(spectra))
+    np.testing.assert_allclose(dense, fortran)
+    bandkeys = srcurves._get_default_bands('S2A')
+    # band 10 (cirrus) covers 1375 nm
+    cirrus = bandkeys.index('swir1')
+    assert np.all(np.isnan(dense[:, cirrus]))
+    assert np.all(np.isfinite(np.delete(dense, cirrus, axis=1)))
+    sparse = srconv.convolve('S2A', wavelength, spectra, sparse=True)
+    np.testing.assert_allclose(dense, sparse)
+    single = srconv.convolve('S2A', wavelength, spectra[0])
+    np.testing.assert_allclose(single, dense[0])
@@ -14,3 +14,30 @@ def test_parse_csv_file(sensor):
     csvfile = srcurves._get_csv_file(sensor)
     data = srcurves._parse_csv(csvfile)
     assert isinstance(data, np.ndarray)
+
+
+def test_parse_csv_matches_genfromtxt(sensor):
+    import numpy as np
+    import sensor_response_curves as srcurves
+    csvfile = srcurves._get_csv_file(sensor)
+    data = srcurves._parse_csv(csvfile)
+    expected = np.genfromtxt(csvfile, delimiter=',', names=True, dtype='float', comments='#')
+    assert data.dtype == expected.dtype
+    for name in expected.dtype.names:
+        np.testing.assert_array_equal(data[name], expected[name])
+
+
+def test_parse_csv_array(tmpdir):
+    import io
+    import numpy as np
+    import sensor_response_curves as srcurves
+    csvfile = str(tmpdir.join('test.txt'))
+    with io.open(csvfile, 'w', encoding='utf-8', newline='\r\n') as f:
+        f.write(u'\ufeffWavelength [nm],Red Edge,NIR\n400,,1\n401,0.5,  # comment\n# source\n')
+    names, values = srcurves._parse_csv_array(csvfile)
+    assert names == [u'\ufeffWavelength_nm', 'Red_Edge', 'NIR']
+    assert values.flags.c_contiguous
+    np.testing.assert_array_equal(values, [[400, np.nan, 1], [401, 0.5, np.nan]])
+    data = srcurves._parse_csv(csvfile)
+    assert data.base is not None
+    np.testing.assert_array_equal(data['NIR'], [1, np.nan])
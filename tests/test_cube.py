@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import sensor_response_curves.convolution as srconv
+import sensor_response_curves.cube as srcube
+
+
+def _make_cube(nrows=7, ncols=5):
+    wavelength = np.arange(400, 1000, 10.)
+    cube = np.random.RandomState(0).rand(nrows, ncols, wavelength.size).astype('float32')
+    return wavelength, cube
+
+
+@pytest.mark.parametrize('interleave', srcube.INTERLEAVES)
+def test_convolve_raw_cube(interleave, tmpdir):
+    wavelength, cube = _make_cube()
+    path = str(tmpdir.join('cube.' + interleave))
+    cube.transpose(np.argsort(srcube._AXES[interleave])).tofile(path)
+    mm = srcube.open_cube(path, shape=cube.shape, dtype='float32', interleave=interleave)
+    assert srcube.cube_shape(mm, interleave) == cube.shape
+    outfile = str(tmpdir.join('out.npy'))
+    max_bytes = 3 * 5 * (wavelength.size * (4 + 8) + 4 * 8)
+    srcube.convolve_cube(
+        'PHR1A', wavelength, mm, outfile, interleave=interleave, max_bytes=max_bytes)
+    out = np.load(outfile)
+    expected = srconv.convolve('PHR1A', wavelength, cube.astype('float'))
+    np.testing.assert_allclose(out, expected, rtol=1e-5)
+
+
+def test_convolve_npy_cube_in_chunks(tmpdir):
+    wavelength, cube = _make_cube()
+    path = str(tmpdir.join('cube.npy'))
+    np.save(path, cube)
+    bytes_per_row = 5 * (wavelength.size * (4 + 8) + 4 * 8)
+    chunks = list(srcube.iter_convolved_chunks(
+        'PHR1A', wavelength, srcube.open_cube(path), max_bytes=2 * bytes_per_row))
+    assert len(chunks) == 4
+    out = np.zeros((7, 5, 4))
+    srcube.convolve_cube('PHR1A', wavelength, path, out, max_bytes=2 * bytes_per_row)
+    np.testing.assert_allclose(out, np.concatenate([values for _, values in chunks]))
+
+
+def test_rows_per_chunk():
+    assert srcube.rows_per_chunk(1000, 400, 13, 2, max_bytes=10) == 1
+    assert srcube.rows_per_chunk(10, 10, 1, 8, max_bytes=10 * (160 + 8) * 3) == 3
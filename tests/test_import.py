@@ -0,0 +1,35 @@
+import subprocess
+import sys
+
+
+def _run(code):
+    return subprocess.check_output([sys.executable, '-c', code]).decode().strip()
+
+
+def test_import_is_lazy():
+    loaded = _run(
+        'import sys\n'
+        'import sensor_response_curves\n'
+        'print(" ".join(sorted(sys.modules)))').split()
+    assert 'sensor_response_curves._version' not in loaded
+    assert 'subprocess' not in loaded
+    assert not any(name.startswith('scipy') for name in loaded)
+    assert set(name for name in loaded if name.startswith('sensor_response_curves.')) == {
+        'sensor_response_curves._cache'}
+
+
+def test_linear_resample_without_scipy():
+    loaded = _run(
+        'import sys\n'
+        'import sensor_response_curves as srcurves\n'
+        'from sensor_response_curves import resample\n'
+        'resample.resample_response_curves(*srcurves.get_response_curves("L8"), resolution=5)\n'
+        'print(" ".join(sorted(sys.modules)))').split()
+    assert not any(name.startswith('scipy') for name in loaded)
+
+
+def test_lazy_attributes():
+    import sensor_response_curves as srcurves
+    assert isinstance(srcurves.__version__, str)
+    assert srcurves.convolution.convolve
+    assert srcurves.resample.resample_response_curves
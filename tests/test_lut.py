@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+import sensor_response_curves.convolution as srconv
+import sensor_response_curves.lut as srlut
+
+
+def test_iter_blocks_cover_shape():
+    shape = (3, 4, 5, 10)
+    for max_bytes in [1, 7, 15, 40, 200, 10 ** 6]:
+        covered = np.zeros(shape[:-1], dtype=int)
+        for index in srlut.iter_blocks(shape, 1, max_bytes):
+            covered[index] += 1
+            assert covered[index].size <= max(max_bytes, shape[-2])
+        assert np.all(covered == 1)
+
+
+@pytest.mark.parametrize('axis', [0, 2, -1])
+@pytest.mark.parametrize('workers', [None, 3])
+def test_integrate_lut(axis, workers):
+    wavelength = np.arange(400, 1000, 10.)
+    shape = [3, 4, 5]
+    shape.insert(axis % 4 if axis >= 0 else 3, wavelength.size)
+    lut = np.random.RandomState(0).rand(*shape).astype('float32')
+    result = srlut.integrate_lut(
+        'S2A', wavelength, lut, axis=axis, bandkeys=['blue', 'red'],
+        max_bytes=5000, workers=workers)
+    moved = np.moveaxis(lut, axis, -1).reshape(-1, wavelength.size)
+    expected = srconv.convolve('S2A', wavelength, moved, bandkeys=['blue', 'red'])
+    expected = np.moveaxis(
+        expected.reshape(np.moveaxis(lut, axis, -1).shape[:-1] + (2,)), -1, axis)
+    assert result.shape == expected.shape
+    np.testing.assert_allclose(result, expected, rtol=1e-6)
+
+
+def test_integrate_lut_memmap(tmpdir):
+    wavelength = np.arange(400, 1000, 10.)
+    lut = np.random.RandomState(0).rand(6, 7, wavelength.size)
+    out = np.lib.format.open_memmap(
+        str(tmpdir.join('out.npy')), mode='w+', dtype='float64', shape=(6, 7, 3))
+    srlut.integrate_lut(
+        'L8', wavelength, lut, bandkeys=['blue', 'green', 'red'], out=out, max_bytes=100)
+    np.testing.assert_allclose(
+        np.load(str(tmpdir.join('out.npy'))),
+        srconv.convolve('L8', wavelength, lut, bandkeys=['blue', 'green', 'red']))
+
+
+def test_integrate_lut_shape_mismatch():
+    with pytest.raises(ValueError):
+        srlut.integrate_lut('S2A', np.arange(400, 500.), np.zeros((10, 3)), axis=1)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import sensor_response_curves as srcurves
+from sensor_response_curves import bundle
+from sensor_response_curves import metadata
+
+
+def test_index_in_sync(sensor):
+    entry = metadata._INDEX['sensors'][sensor]
+    assert entry['sha1'] == bundle.file_hash(srcurves._get_csv_file(sensor))
+    computed = metadata.compute_sensor_metadata(sensor)
+    assert entry['bandkeys'] == computed['bandkeys']
+    assert entry['wavelength'] == computed['wavelength']
+    for band, values in computed['bands'].items():
+        for key, value in values.items():
+            np.testing.assert_allclose(entry['bands'][band][key], value)
+
+
+def test_sensor_metadata(sensor):
+    meta = metadata.get_sensor_metadata(sensor)
+    wavelength, rcurves = srcurves.get_response_curves(sensor)
+    assert len(meta['default_bandkeys']) == len(rcurves)
+    assert meta['wavelength']['size'] == wavelength.size
+    for band in meta['default_bandkeys']:
+        band_meta = metadata.get_band_metadata(sensor, band)
+        assert band_meta['fwhm'] > 0
+        lo, hi = band_meta['support_wavelength']
+        assert lo <= band_meta['peak'] <= hi
+
+
+def test_s2_red_band():
+    band_meta = metadata.get_band_metadata('S2A', 'red')
+    assert abs(band_meta['centre'] - 664.6) < 1
+    assert abs(band_meta['fwhm'] - 31) < 1
+
+
+def test_stale_entry_recomputed(monkeypatch):
+    monkeypatch.setitem(metadata._INDEX['sensors'], 'L8', {'sha1': 'stale'})
+    monkeypatch.setattr(metadata, '_VERIFIED', set())
+    assert 'bands' in metadata.get_sensor_metadata('L8')
+
+
+def test_undefined_band():
+    with pytest.raises(ValueError):
+        metadata.get_band_metadata('L7', 'coastal')
+
+
+def test_metadata_is_copy():
+    meta = metadata.get_sensor_metadata('L8')
+    meta['bands']['red']['fwhm'] = -1
+    meta['bandkeys'].append('bogus')
+    band_meta = metadata.get_band_metadata('L8', 'red')
+    band_meta['centre'] = -1
+    assert metadata.get_band_metadata('L8', 'red')['fwhm'] > 0
+    assert metadata.get_band_metadata('L8', 'red')['centre'] > 0
+    assert 'bogus' not in metadata.get_sensor_metadata('L8')['bandkeys']
@@ -0,0 +1,46 @@
+import numpy as np
+
+import sensor_response_curves.convolution as srconv
+import sensor_response_curves.parallel as srparallel
+
+
+def _make_spectra(npixels=101):
+    wavelength = np.arange(400, 1000, 5.)
+    spectra = np.random.RandomState(0).rand(npixels, wavelength.size)
+    return wavelength, spectra
+
+
+def test_convolve_parallel():
+    wavelength, spectra = _make_spectra()
+    values = srparallel.convolve_parallel('S2A', wavelength, spectra, workers=2, chunksize=10)
+    np.testing.assert_allclose(values, srconv.convolve('S2A', wavelength, spectra))
+
+
+def test_convolve_parallel_memmap(tmpdir):
+    wavelength, spectra = _make_spectra()
+    infile = str(tmpdir.join('spectra.npy'))
+    np.save(infile, spectra.astype('float32'))
+    spectra_mm = np.load(infile, mmap_mode='r')
+    out = np.lib.format.open_memmap(
+        str(tmpdir.join('out.npy')), mode='w+', dtype='float64', shape=(len(spectra), 4))
+    values = srparallel.convolve_parallel(
+        'PHR1A', wavelength, spectra_mm, out=out, workers=2, chunksize=25)
+    assert values is out
+    expected = srconv.convolve('PHR1A', wavelength, spectra.astype('float32'))
+    np.testing.assert_allclose(np.load(str(tmpdir.join('out.npy'))), expected, rtol=1e-6)
+
+
+def test_convolve_parallel_fortran_memmap(tmpdir):
+    wavelength, spectra = _make_spectra()
+    infile = str(tmpdir.join('spectra.npy'))
+    np.save(infile, np.asfortranarray(spectra))
+    spectra_mm = np.load(infile, mmap_mode='r')
+    assert spectra_mm.flags.f_contiguous and not spectra_mm.flags.c_contiguous
+    out = np.lib.format.open_memmap(
+        str(tmpdir.join('out.npy')), mode='w+', dtype='float64',
+        shape=(len(spectra), 13), fortran_order=True)
+    values = srparallel.convolve_parallel(
+        'S2A', wavelength, spectra_mm, out=out, workers=2, chunksize=25)
+    assert values is out
+    expected = srconv.convolve('S2A', wavelength, spectra)
+    np.testing.assert_allclose(np.load(str(tmpdir.join('out.npy'))), expected)
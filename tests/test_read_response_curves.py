@@ -30,3 +30,135 @@ def test_get_band_ids(sensor):
     wavelength, rcurves = srcurves.get_response_curves(
         sensor, pan_only=False, band_ids=band_ids)
     assert rcurves.shape[0] == len(band_ids)
+
+
+def test_data_cached_readonly(sensor):
+    import pytest
+    import sensor_response_curves as srcurves
+    srcurves.clear_cache()
+    data = srcurves.get_data_raw(sensor)
+    assert srcurves.get_data_raw(sensor) is data
+    assert srcurves.cache_info().hits == 1
+    with pytest.raises(ValueError):
+        data[data.dtype.names[0]][0] = 0
+
+
+def test_standard_names_keep_raw_intact(sensor):
+    import sensor_response_curves as srcurves
+    srcurves.clear_cache()
+    standard = srcurves.get_data_standard_names(sensor)
+    raw = srcurves.get_data_raw(sensor)
+    assert 'wavelength' in standard.dtype.names
+    assert 'wavelength' not in raw.dtype.names
+    assert srcurves.cache_info().currsize == 2
+
+
+def test_cache_maxsize():
+    import sensor_response_curves as srcurves
+    srcurves.clear_cache()
+    srcurves.set_cache_maxsize(2)
+    try:
+        for sensor in ['S2A', 'S2B', 'L8']:
+            srcurves.get_data_raw(sensor)
+        assert srcurves.cache_info().currsize == 2
+        srcurves.get_data_raw('S2A')
+        assert srcurves.cache_info().hits == 0
+    finally:
+        srcurves.set_cache_maxsize(None)
+        srcurves.clear_cache()
+
+
+def test_cache_invalidated_by_mtime(tmpdir, monkeypatch):
+    import os
+    import shutil
+    import sensor_response_curves as srcurves
+    csvfile = str(tmpdir.join('L8.txt'))
+    shutil.copy(srcurves._get_csv_file('L8'), csvfile)
+    monkeypatch.setattr(srcurves, 'CSVDIR', str(tmpdir))
+    srcurves.clear_cache()
+    data = srcurves.get_data_raw('L8')
+    mtime = os.path.getmtime(csvfile)
+    os.utime(csvfile, (mtime + 10, mtime + 10))
+    assert srcurves.get_data_raw('L8') is not data
+    srcurves.clear_cache()
+
+
+def test_response_curves_match_data(sensor):
+    import numpy as np
+    import sensor_response_curves as srcurves
+    data = srcurves.get_data_standard_names(sensor)
+    bandkeys = ['green', 'red', 'blue']
+    wavelength, rcurves = srcurves.get_response_curves(sensor, bandkeys=bandkeys)
+    np.testing.assert_array_equal(wavelength, data['wavelength'])
+    for name, rcurve in zip(bandkeys, rcurves):
+        np.testing.assert_array_equal(rcurve, data[name])
+
+
+def test_default_response_curves_are_view(sensor):
+    import numpy as np
+    import sensor_response_curves as srcurves
+    _, rcurves = srcurves.get_response_curves(sensor)
+    _, rcurves2 = srcurves.get_response_curves(sensor)
+    assert rcurves.flags.c_contiguous
+    assert np.shares_memory(rcurves, rcurves2)
+
+
+def test_response_curves_out(sensor):
+    import numpy as np
+    import sensor_response_curves as srcurves
+    wavelength, expected = srcurves.get_response_curves(sensor, band_ids=[2, 0])
+    out = np.empty((2, wavelength.size))
+    _, rcurves = srcurves.get_response_curves(sensor, band_ids=[2, 0], out=out)
+    assert rcurves is out
+    np.testing.assert_array_equal(out, expected)
+    _, expected = srcurves.get_response_curves(sensor)
+    out = np.empty_like(expected)
+    _, rcurves = srcurves.get_response_curves(sensor, out=out)
+    assert rcurves is out
+    np.testing.assert_array_equal(out, expected)
+
+
+def test_response_curves_out_shape():
+    import numpy as np
+    import pytest
+    import sensor_response_curves as srcurves
+    wavelength, _ = srcurves.get_response_curves('L8')
+    out = np.zeros((6, wavelength.size))
+    with pytest.raises(ValueError):
+        srcurves.get_response_curves('L8', pan_only=True, out=out)
+    with pytest.raises(ValueError):
+        srcurves.get_response_curves('L8', band_ids=[2, 0], out=out)
+
+
+def test_load_all():
+    import sensor_response_curves as srcurves
+    srcurves.clear_cache()
+    srcurves.load_all(workers=4)
+    assert srcurves.cache_info().currsize == 3 * len(srcurves.SUPPORTED_SENSORS)
+    misses = srcurves.cache_info().misses
+    srcurves.get_response_curves('S2A')
+    assert srcurves.cache_info().misses == misses
+
+
+def test_concurrent_load_waits_for_inflight(monkeypatch):
+    import threading
+    import time
+    import sensor_response_curves as srcurves
+    calls = []
+    load_csv_data = srcurves._load_csv_data
+
+    def slow_load(sensor, infile):
+        calls.append(sensor)
+        time.sleep(0.05)
+        return load_csv_data(sensor, infile)
+
+    monkeypatch.setattr(srcurves, '_load_csv_data', slow_load)
+    srcurves.clear_cache()
+    threads = [threading.Thread(target=srcurves.get_data_raw, args=('L8',)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    srcurves.load_all(['L8', 'L7'])
+    for thread in threads:
+        thread.join()
+    assert sorted(calls) == ['L7', 'L8']
+    srcurves.clear_cache()
@@ -6,3 +6,93 @@ def test_resample_response_curves():
     sensor = 'S2A'
     wavelength, rcurves = srcurves.get_response_curves(sensor)
     wavelength, rcurves = srresample.resample_response_curves(wavelength, rcurves, resolution=5)
+
+
+def test_linear_engine_matches_interp1d(sensor):
+    import numpy as np
+    import scipy.interpolate
+    wavelength, rcurves = srcurves.get_response_curves(sensor)
+    rcurves = np.nan_to_num(rcurves)
+    xnew = np.linspace(wavelength[0] - 10, wavelength[-1] + 10, 997)
+    expected = scipy.interpolate.interp1d(
+        wavelength, rcurves, kind='slinear', axis=1, bounds_error=False, fill_value=0)(xnew)
+    np.testing.assert_allclose(srresample._interpolate(wavelength, rcurves, xnew), expected)
+
+
+def test_resample_spline_kind():
+    wavelength, rcurves = srcurves.get_response_curves('L8')
+    wavelength_new, rcurves_new = srresample.resample_response_curves(
+        wavelength, rcurves, resolution=2, kind='cubic')
+    assert rcurves_new.shape == (rcurves.shape[0], wavelength_new.size)
+
+
+def test_resample_target_wavelength(sensor):
+    import numpy as np
+    wavelength, rcurves = srcurves.get_response_curves(sensor)
+    target = np.sort(np.random.RandomState(0).uniform(300, 2600, 200))
+    wavelength_new, rcurves_new = srresample.resample_response_curves(
+        wavelength, rcurves, target_wavelength=target)
+    np.testing.assert_array_equal(wavelength_new, target)
+    assert rcurves_new.shape == (rcurves.shape[0], target.size)
+    wavelength_clip, rcurves_clip = srresample.resample_response_curves(
+        wavelength, rcurves, target_wavelength=target, clip_to_support=True)
+    mask = np.isin(target, wavelength_clip)
+    assert not np.any(rcurves_new[:, ~mask])
+
+
+def test_linear_weights_cached():
+    import numpy as np
+    target = np.arange(400, 900, 3.5)
+    wavelength, _ = srcurves.get_response_curves('WV2')
+    weights = srresample.get_linear_weights(wavelength, target)
+    assert srresample.get_linear_weights(wavelength.copy(), target.copy()) is weights
+    assert not weights.index.flags.writeable
+
+
+def test_resample_requires_grid():
+    import pytest
+    wavelength, rcurves = srcurves.get_response_curves('L8')
+    with pytest.raises(ValueError):
+        srresample.resample_response_curves(wavelength, rcurves)
+
+
+def test_rebin_conserves_integral(sensor):
+    import numpy as np
+    wavelength, rcurves = srcurves.get_response_curves(sensor)
+    rcurves = np.nan_to_num(rcurves)
+    wavelength_new, rcurves_new = srresample.resample_response_curves(
+        wavelength, rcurves, resolution=10, kind='rebin')
+    widths = np.diff(srresample._bin_edges(wavelength_new))
+    expected = np.sum(
+        np.diff(wavelength) * (rcurves[:, 1:] + rcurves[:, :-1]) / 2, axis=1)
+    np.testing.assert_allclose(np.sum(rcurves_new * widths, axis=1), expected)
+
+
+def test_rebin_constant():
+    import numpy as np
+    wavelength = np.arange(400, 501, 1.)
+    rcurves = np.ones((1, wavelength.size))
+    _, rcurves_new = srresample.resample_response_curves(
+        wavelength, rcurves, target_wavelength=np.arange(410, 491, 10.), kind='rebin')
+    np.testing.assert_allclose(rcurves_new, 1)
+
+
+def test_resample_descending_grid():
+    import numpy as np
+    import scipy.interpolate
+    wavelength = np.arange(400, 700, 2.)
+    rcurves = np.exp(-((wavelength - 550) / 20.) ** 2)[None]
+    target = np.arange(390, 710, 3.)
+    expected = scipy.interpolate.interp1d(
+        wavelength, rcurves, kind='slinear', axis=1, bounds_error=False,
+        fill_value=0)(target)
+    for kind in ['slinear', 'rebin', 'cubic']:
+        _, ascending = srresample.resample_response_curves(
+            wavelength, rcurves, kind=kind, target_wavelength=target)
+        _, descending = srresample.resample_response_curves(
+            wavelength[::-1], rcurves[:, ::-1], kind=kind, target_wavelength=target)
+        np.testing.assert_allclose(descending, ascending, atol=1e-12)
+    _, descending = srresample.resample_response_curves(
+        wavelength[::-1], rcurves[:, ::-1], target_wavelength=target)
+    np.testing.assert_allclose(descending, expected)
+    assert srresample._support_range(wavelength[::-1], rcurves[:, ::-1]) == (400, 698)
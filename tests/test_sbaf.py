@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+import sensor_response_curves.convolution as srconv
+import sensor_response_curves.sbaf as srsbaf
+
+
+def _library(nspectra=50):
+    wavelength = np.arange(400, 2500, 5.)
+    rs = np.random.RandomState(0)
+    slopes = rs.rand(nspectra, 1)
+    library = 0.1 + slopes * (wavelength - 400) / 2100 + 0.01 * rs.rand(nspectra, wavelength.size)
+    return wavelength, library
+
+
+def test_get_sbaf():
+    wavelength, library = _library()
+    sensors = ['S2A', 'S2B', 'L8']
+    table = srsbaf.get_sbaf(sensors, wavelength, library)
+    assert len(table) == 6
+    sbaf = table[('S2A', 'L8')]
+    assert 'red' in sbaf.bandkeys and 'nir1' in sbaf.bandkeys
+    j = sbaf.bandkeys.index('red')
+    x = srconv.convolve('S2A', wavelength, library, bandkeys=['red'])[:, 0]
+    y = srconv.convolve('L8', wavelength, library, bandkeys=['red'])[:, 0]
+    slope, intercept = np.polyfit(x, y, 1)
+    assert np.isclose(sbaf.slope[j], slope)
+    assert np.isclose(sbaf.intercept[j], intercept)
+    assert np.isclose(sbaf.rvalue[j], np.corrcoef(x, y)[0, 1])
+    assert np.isclose(sbaf.ratio[j], y.mean() / x.mean())
+    assert srsbaf.get_sbaf(sensors, wavelength, library.copy()) is table
+
+
+def test_get_sbaf_identity():
+    wavelength, library = _library()
+    table = srsbaf.get_sbaf(['S2A', 'S2A'], wavelength, library)
+    np.testing.assert_allclose(table[('S2A', 'S2A')].slope, 1)
+    np.testing.assert_allclose(table[('S2A', 'S2A')].intercept, 0, atol=1e-12)
+
+
+def test_get_sbaf_shape_mismatch():
+    with pytest.raises(ValueError):
+        srsbaf.get_sbaf(['S2A', 'L8'], np.arange(400, 500.), np.zeros((3, 10)))
@@ -0,0 +1,118 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import sensor_response_curves as srcurves
+from sensor_response_curves import shared
+
+
+def test_publish_and_attach():
+    expected = {
+        sensor: srcurves.get_response_curves(sensor, band_ids=[0, 2])
+        for sensor in srcurves.SUPPORTED_SENSORS}
+    raw = srcurves.get_data_raw('PNEO3')
+    store = shared.publish()
+    try:
+        assert shared.get_store() is store
+        assert store.sensors == srcurves.SUPPORTED_SENSORS
+        for sensor, (wavelength, rcurves) in expected.items():
+            wavelength2, rcurves2 = srcurves.get_response_curves(sensor, band_ids=[0, 2])
+            np.testing.assert_array_equal(wavelength2, wavelength)
+            np.testing.assert_array_equal(rcurves2, rcurves)
+        raw2 = srcurves.get_data_raw('PNEO3')
+        assert raw2.dtype == raw.dtype
+        _, rcurves = srcurves.get_response_curves('S2A')
+        assert np.shares_memory(rcurves, np.frombuffer(store._shm.buf, dtype=np.uint8))
+        del raw2, rcurves, wavelength2, rcurves2
+    finally:
+        shared.detach()
+    assert shared.get_store() is None
+
+
+def test_attach_from_other_process():
+    store = shared.publish(['L8'])
+    try:
+        code = (
+            'from sensor_response_curves import shared\n'
+            'import sensor_response_curves as srcurves\n'
+            'store = shared.attach({!r})\n'
+            'print(srcurves.get_response_curves("L8")[1].sum())\n'
+            'shared.detach()\n').format(store.name)
+        output = subprocess.check_output([sys.executable, '-c', code])
+        expected = srcurves.get_response_curves('L8')[1].sum()
+        assert np.isclose(float(output), expected)
+    finally:
+        shared.detach()
+
+
+def test_reattach_in_publisher():
+    store = shared.publish(['L8'])
+    try:
+        expected = srcurves.get_response_curves('L8')[1].sum()
+        store2 = shared.reattach()
+        assert store2.name == store.name
+        assert store2.owner
+        assert shared.get_store() is store2
+        assert np.isclose(srcurves.get_response_curves('L8')[1].sum(), expected)
+    finally:
+        shared.detach()
+    assert shared.reattach() is None
+
+
+def test_publish_twice_unlinks_previous():
+    first = shared.publish(['L8'])
+    try:
+        second = shared.publish(['S2A'])
+        assert not first.owner
+        try:
+            shared.attach(first.name)
+        except FileNotFoundError:
+            pass
+        else:
+            raise AssertionError('previous block was not unlinked')
+    finally:
+        shared.detach()
+
+
+def test_worker_with_tracker_does_not_unlink():
+    store = shared.publish(['L8'])
+    try:
+        code = (
+            'from multiprocessing import shared_memory\n'
+            'from sensor_response_curves import shared\n'
+            'other = shared_memory.SharedMemory(create=True, size=10)\n'
+            'other.close()\n'
+            'other.unlink()\n'
+            'shared.attach({!r})\n'
+            'shared.detach()\n').format(store.name)
+        subprocess.check_call([sys.executable, '-c', code])
+        store2 = shared.reattach()
+        assert srcurves.get_response_curves('L8')[1].size
+        assert store2.name == store.name
+    finally:
+        shared.detach()
+
+
+def test_context_manager_detaches():
+    expected = srcurves.get_response_curves('L8')[0].copy()
+    with shared.publish(['L8']) as store:
+        assert shared.get_store() is store
+    assert shared.get_store() is None
+    assert store.closed and not store.is_current('L8', 0)
+    srcurves.clear_cache()
+    np.testing.assert_array_equal(srcurves.get_response_curves('L8')[0], expected)
+
+
+def test_close_uninstalls():
+    expected = srcurves.get_response_curves('L8')[0].copy()
+    store = shared.publish(['L8'])
+    try:
+        store.close()
+        assert shared.get_store() is None
+        np.testing.assert_array_equal(srcurves.get_response_curves('L8')[0], expected)
+        with pytest.raises(ValueError):
+            store.get_data_raw('L8')
+    finally:
+        store.unlink()
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+import sensor_response_curves.convolution as srconv
+import sensor_response_curves.solar as srsolar
+
+
+def _solar_spectrum():
+    wavelength = np.arange(300, 2601, 1.)
+    # Planck curve of a 5778 K black body, arbitrary scale
+    x = 1.4388e7 / (wavelength * 5778)
+    return wavelength, 1e14 / wavelength ** 5 / np.expm1(x)
+
+
+def test_get_esun():
+    wavelength, irradiance = _solar_spectrum()
+    esun = srsolar.get_esun(['S2A', 'L8'], wavelength, irradiance)
+    assert esun['S2A'].shape == (13,)
+    np.testing.assert_allclose(esun['L8'], srconv.convolve('L8', wavelength, irradiance))
+    assert np.all(esun['S2A'] > 0)
+    assert not esun['S2A'].flags.writeable
+    assert srsolar.get_esun(['S2A', 'L8'], wavelength, irradiance.copy()) is esun
+    assert list(srsolar.get_esun('L8', wavelength, irradiance)) == ['L8']
+
+
+def test_get_esun_shape_mismatch():
+    with pytest.raises(ValueError):
+        srsolar.get_esun('S2A', np.arange(400, 500.), np.zeros(10))
@@ -0,0 +1,36 @@
+import numpy as np
+
+import sensor_response_curves as srcurves
+import sensor_response_curves.support as srsupport
+
+
+def test_band_support():
+    rcurves = np.array([
+        [0, 0, 0.1, 1, 0.5, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0],
+        [1, 0, 0, 0, 0, 0, 0.001]])
+    start, stop = srsupport.band_support(rcurves)
+    np.testing.assert_array_equal(start, [2, 0, 0])
+    np.testing.assert_array_equal(stop, [5, 0, 7])
+    start, stop = srsupport.band_support(rcurves, threshold=0.2)
+    np.testing.assert_array_equal(start, [3, 0, 0])
+    np.testing.assert_array_equal(stop, [5, 0, 1])
+
+
+def test_get_band_support(sensor):
+    wavelength, rcurves = srcurves.get_response_curves(sensor)
+    start, stop = srsupport.get_band_support(sensor, threshold=1e-3)
+    assert len(start) == len(rcurves)
+    for rcurve, i0, i1 in zip(rcurves, start, stop):
+        assert not np.any(rcurve[:i0] > 1e-3 * np.nanmax(rcurve))
+        assert not np.any(rcurve[i1:] > 1e-3 * np.nanmax(rcurve))
+    start2, stop2 = srsupport.get_band_support(sensor, band_ids=[1], threshold=1e-3)
+    assert (start2[0], stop2[0]) == (start[1], stop[1])
+
+
+def test_compact_response_curves(sensor):
+    wavelength, rcurves = srcurves.get_response_curves(sensor)
+    compact = srsupport.compact_response_curves(rcurves)
+    assert sum(len(c.values) for c in compact) <= rcurves.size
+    expanded = srsupport.expand_response_curves(compact, len(wavelength))
+    np.testing.assert_array_equal(expanded, np.where(rcurves > 0, rcurves, 0))
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import numpy as np
+
+import sensor_response_curves as srcurves
+import sensor_response_curves.convolution as srconv
+from sensor_response_curves import bundle
+
+NTHREADS = 300
+
+
+def _run_threads(target, args_list):
+    barrier = threading.Barrier(len(args_list))
+    errors = []
+
+    def run(*args):
+        barrier.wait()
+        try:
+            target(*args)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=args) for args in args_list]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+
+
+def test_concurrent_loads_parse_once(monkeypatch):
+    monkeypatch.setenv(bundle.BUNDLE_DIR_ENV, '')
+    calls = []
+    parse_csv = srcurves._parse_csv
+
+    def slow_parse(infile):
+        calls.append(infile)
+        time.sleep(0.01)
+        return parse_csv(infile)
+
+    monkeypatch.setattr(srcurves, '_parse_csv', slow_parse)
+    srcurves.clear_cache()
+    sensors = ['S2A', 'WV3', 'L8']
+    _run_threads(
+        srcurves.get_response_curves,
+        [(sensors[i % len(sensors)],) for i in range(NTHREADS)])
+    assert sorted(calls) == sorted(srcurves._get_csv_file(sensor) for sensor in sensors)
+    srcurves.clear_cache()
+
+
+def test_concurrent_kernels_built_once(monkeypatch):
+    calls = []
+    build_kernel = srconv.build_kernel
+
+    def counting_build_kernel(*args, **kwargs):
+        calls.append(args[0])
+        return build_kernel(*args, **kwargs)
+
+    monkeypatch.setattr(srconv, 'build_kernel', counting_build_kernel)
+    srconv.clear_kernel_cache()
+    wavelength = np.arange(400, 1000, 2.)
+    spectra = np.ones((3, wavelength.size))
+    _run_threads(
+        srconv.convolve,
+        [(['S2A', 'S2B'][i % 2], wavelength, spectra) for i in range(NTHREADS)])
+    assert sorted(calls) == ['S2A', 'S2B']
+    srconv.clear_kernel_cache()
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import sensor_response_curves.convolution as srconv
+import sensor_response_curves.transform as srtransform
+
+
+def _library(nspectra=200):
+    wavelength = np.arange(400, 2500, 5.)
+    rs = np.random.RandomState(0)
+    centres = np.linspace(400, 2500, 8)
+    basis = np.exp(-((wavelength - centres[:, None]) / 300.) ** 2)
+    return wavelength, np.dot(rs.rand(nspectra, len(centres)), basis)
+
+
+def test_fit_transform():
+    wavelength, library = _library()
+    transform = srtransform.fit_transform('S2A', 'S2B', wavelength, library)
+    assert transform.matrix.shape == (13, 13)
+    assert transform.target_bandkeys[3] == 'red'
+    x = srconv.convolve('S2A', wavelength, library)
+    y = srconv.convolve('S2B', wavelength, library)
+    predicted = srtransform.apply_transform(transform, x)
+    assert np.abs(predicted - y).max() < 0.01 * np.abs(y).max()
+
+
+def test_apply_transform_chunked(tmpdir):
+    wavelength, library = _library()
+    transform = srtransform.fit_transform('WV2', 'S2A', wavelength, library)
+    path = str(tmpdir.join('transform.npz'))
+    srtransform.save_transform(transform, path)
+    loaded = srtransform.load_transform(path)
+    assert loaded.source == 'WV2'
+    assert loaded.target_bandkeys == transform.target_bandkeys
+    np.testing.assert_array_equal(loaded.matrix, transform.matrix)
+
+    values = np.random.RandomState(1).rand(7, 5, 8).astype('float32')
+    expected = np.dot(values.astype('float'), transform.matrix.T) + transform.offset
+    out = np.lib.format.open_memmap(
+        str(tmpdir.join('out.npy')), mode='w+', dtype='float32', shape=(7, 5, 13))
+    result = srtransform.apply_transform(loaded, values, out=out, max_bytes=1000)
+    assert result is out
+    np.testing.assert_allclose(out, expected, rtol=1e-5)
+
+
+def test_apply_transform_shape_mismatch():
+    wavelength, library = _library()
+    transform = srtransform.fit_transform('S2A', 'L8', wavelength, library)
+    with pytest.raises(ValueError):
+        srtransform.apply_transform(transform, np.zeros((3, 4)))
+
+
+def test_fit_transform_outside_range():
+    wavelength, library = _library()
+    with pytest.raises(ValueError):
+        srtransform.fit_transform('S2A', 'L8', wavelength[:50], library[:, :50])